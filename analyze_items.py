@@ -0,0 +1,32 @@
+"""輸出量表品質報告：題目-總分相關、各軸 Cronbach's alpha 與建議的一致性門檻。
+
+用法：python analyze_items.py [--db data/ctos.sqlite3]
+"""
+import argparse
+import json
+import sys
+
+from psychometrics import ItemStatistics
+from question_bank import load_question_bank
+from store import ResponseStore
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="作答資料庫路徑 (預設同 CTOS_DB_PATH)")
+    parser.add_argument("--inconsistent-quantile", type=float, default=0.8)
+    parser.add_argument("--random-quantile", type=float, default=0.95)
+    args = parser.parse_args(argv)
+
+    store = ResponseStore(args.db)
+    stats = ItemStatistics(load_question_bank())
+    stats.refresh(store)
+    report = stats.report()
+    report["thresholds"] = stats.recalibrate(args.inconsistent_quantile, args.random_quantile)
+    store.close()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
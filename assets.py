@@ -0,0 +1,66 @@
+"""靜態資源包：樣式表、工具卡片 HTML 與 Phase 1 角色圖片。
+
+圖片由 build_assets.py 預先縮圖為 WebP 存放於 assets/img/，
+執行時整包讀入記憶體一次 (app.py 透過 st.cache_resource 快取)，
+之後每次 rerun 只引用同一份內容，不再向外部網站取圖。
+樣式表放在 static/，啟用 Streamlit 靜態檔案服務時 (.streamlit/config.toml)
+每次 rerun 只送出一行 <link>，由瀏覽器快取；未啟用時才內嵌整份 <style>。
+"""
+import hashlib
+from pathlib import Path
+
+ASSET_DIR = Path(__file__).with_name("assets")
+IMAGE_DIR = ASSET_DIR / "img"
+STATIC_DIR = Path(__file__).with_name("static")
+STYLE_PATH = STATIC_DIR / "style.css"
+
+# 登山隱喻圖片所屬的題目
+ROLE_IMAGE_QUESTION = "P1-Q1"
+
+
+def role_image_path(qid, option_id):
+    return IMAGE_DIR / f"{qid}_{option_id}.webp"
+
+
+def load_role_image(qid, option):
+    """回傳本地縮圖的 bytes；尚未執行 build_assets.py 時退回原始網址。"""
+    path = role_image_path(qid, option["id"])
+    if path.exists():
+        return path.read_bytes()
+    return option["image_url"]
+
+
+def load_css(static_serving=False):
+    css = STYLE_PATH.read_text(encoding="utf-8")
+    if static_serving:
+        # 以內容雜湊作為版本參數，樣式更新後瀏覽器不會沿用舊快取
+        digest = hashlib.sha256(css.encode("utf-8")).hexdigest()[:12]
+        return f'<link rel="stylesheet" href="app/static/{STYLE_PATH.name}?v={digest}">'
+    return f"<style>\n{css}</style>"
+
+
+def tool_cards_html(options):
+    cards = []
+    for opt in options:
+        card = opt["card"]
+        cards.append(f"""<div class="tool-card">
+    <div class="tool-icon">{card['icon']}</div>
+    <div class="tool-title">{card['title']}</div>
+    <div class="tool-desc">
+        <b>功能：</b>{card['function']}<br>
+        <b>方向：</b>{card['direction']}
+    </div>
+</div>""")
+    return '<div class="tool-grid">\n' + "\n".join(cards) + "\n</div>"
+
+
+def build_bundle(bank, static_serving=False):
+    """組合整頁所需的靜態資源，每個行程只需建立一次。"""
+    return {
+        "css": load_css(static_serving),
+        "tool_cards": tool_cards_html(bank.question("P1-Q2")["options"]),
+        "role_images": {
+            opt["id"]: load_role_image(ROLE_IMAGE_QUESTION, opt)
+            for opt in bank.question(ROLE_IMAGE_QUESTION)["options"]
+        },
+    }
@@ -0,0 +1,120 @@
+"""批量計分：將紙本 / 表單收集的作答檔轉為座標與象限。
+
+輸入為 CSV 或 Excel，每列一位受測者，欄名為題號 (排序題為「題號_名次」，
+例如 P3-Q1_1、P3-Q1_2)，欄值為題庫中的選項 ID (量尺題為刻度值)。
+輸出保留原有欄位，並加上 X、Y、變異數、一致性旗標與象限。
+
+用法：
+    python batch_score.py responses.csv -o scored.csv
+    python batch_score.py responses.xlsx -o scored.csv --workers 8 --chunksize 20000
+    python batch_score.py --template > template.csv
+"""
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from ledger import QUADRANT_LABELS
+from question_bank import load_question_bank
+from scoring import ScoringMatrix
+
+EXCEL_SUFFIXES = (".xlsx", ".xls")
+
+_MATRIX = None
+
+
+def _init_worker():
+    global _MATRIX
+    _MATRIX = ScoringMatrix(load_question_bank())
+
+
+def score_frame(df, matrix=None):
+    matrix = matrix or _MATRIX
+    table = {col: df[col].tolist() for col in matrix.columns if col in df.columns}
+    if not table:
+        raise ValueError(f"找不到任何作答欄位，需要下列欄名之一：{', '.join(matrix.columns)}")
+    result = matrix.score(matrix.codes_from_ids(table))
+    out = df.copy()
+    for name, values in result.items():
+        out[name] = values
+    out["is_inconsistent"] = out["is_inconsistent"].astype(int)
+    out["is_random"] = out["is_random"].astype(int)
+    out["quadrant_label"] = out["quadrant"].map(QUADRANT_LABELS)
+    return out
+
+
+def read_excel(path, **kwargs):
+    """pd.read_excel；缺少讀取套件時改為明確的錯誤訊息。"""
+    try:
+        return pd.read_excel(path, **kwargs)
+    except ImportError as e:
+        raise ImportError(f"讀取 Excel 檔需要 openpyxl (.xlsx) 或 xlrd (.xls) 套件，"
+                          f"請執行 pip install -r requirements.txt 或先另存為 CSV ({e})") from e
+
+
+def read_chunks(path, chunksize):
+    if str(path).lower().endswith(EXCEL_SUFFIXES):
+        df = read_excel(path, dtype=str)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+    else:
+        yield from pd.read_csv(path, dtype=str, chunksize=chunksize, encoding="utf-8-sig")
+
+
+def bounded_map(pool, fn, items, window):
+    """依序產生 fn(item)，同時最多只有 window 個工作在執行中。
+
+    Executor.map 會先取完整個輸入再送出全部工作，大型 CSV 因此會整份讀進記憶體；
+    這裡邊讀邊送，讀取進度只領先寫出 window 批。
+    """
+    pending = deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", nargs="?", help="作答檔 (.csv / .xlsx)")
+    parser.add_argument("-o", "--output", help="輸出 CSV (預設為標準輸出)")
+    parser.add_argument("--chunksize", type=int, default=10000, help="每批處理的列數")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="行程數 (1 表示不使用行程池)")
+    parser.add_argument("--template", action="store_true", help="輸出空白作答範本的欄名")
+    args = parser.parse_args(argv)
+
+    if args.template:
+        print(",".join(["respondent_id"] + ScoringMatrix(load_question_bank()).columns))
+        return 0
+    if not args.input:
+        parser.error("需要指定作答檔")
+
+    out = open(args.output, "w", encoding="utf-8-sig", newline="") if args.output else sys.stdout
+    pool = None
+    try:
+        chunks = read_chunks(args.input, args.chunksize)
+        if args.workers == 1:
+            _init_worker()
+            scored = map(score_frame, chunks)
+        else:
+            pool = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker)
+            scored = bounded_map(pool, score_frame, chunks, window=2 * args.workers)
+        for i, frame in enumerate(scored):
+            frame.to_csv(out, index=False, header=(i == 0))
+    except ImportError as e:
+        parser.error(str(e))
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""量測最近取向分類器在大量參照受測者下的查詢延遲，並與暴力法核對結果。
+
+用法：python benchmarks/bench_orientation.py [--references 1000000] [--queries 2000]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from orientation import ORIENTATION_KEYS, OrientationIndex  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--references", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    xs = rng.normal(0, 8, args.references)
+    ys = rng.normal(0, 8, args.references)
+    labels = rng.choice(ORIENTATION_KEYS, args.references)
+
+    index = OrientationIndex()
+    t0 = time.perf_counter()
+    index.add(xs, ys, labels)
+    build_s = time.perf_counter() - t0
+
+    queries = np.clip(rng.normal(0, 8, (args.queries, 2)), -20, 20)
+    latencies = []
+    for qx, qy in queries:
+        t0 = time.perf_counter()
+        index.query(qx, qy)
+        latencies.append(time.perf_counter() - t0)
+    latencies = np.asarray(latencies) * 1000
+
+    # 抽查最近鄰是否與暴力法一致
+    xy = np.stack([xs, ys], axis=1)
+    for qx, qy in queries[:20]:
+        q = np.array([qx, qy])
+        dist, _ = index._nearest(q, 32)
+        brute = np.sort(np.hypot(*(xy - q).T))[:32]
+        assert np.allclose(np.sort(dist), brute)
+
+    print(json.dumps({
+        "references": args.references,
+        "grid_bins": index.bins,
+        "build_s": build_s,
+        "query_ms": {"p50": float(np.percentile(latencies, 50)), "p99": float(np.percentile(latencies, 99)),
+                     "max": float(latencies.max())},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""量測新行程的啟動時間：有無暖機 (serve.warm_up) 時的首次繪製與首次開啟 Phase 5。
+
+每次量測都在全新的子行程中進行 (模擬自動擴充新增的副本)，以 AppTest 依序繪製：
+前言頁 (首次繪製)、Phase 1，以及帶有作答的 Phase 5 報告。
+- ready_s：行程開始到可以接受連線 (暖機模式包含暖機時間)
+- first_paint_s：第一位使用者開啟前言頁的繪製時間
+- phase1_s / phase5_s：第一次開啟 Phase 1 / Phase 5 的繪製時間
+加上 --server 另外量測 `streamlit run app.py` 與 `python serve.py` 到健康檢查回應的時間。
+
+用法：python benchmarks/bench_startup.py [--repeat 3] [--server]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY = ("numpy", "pandas", "altair")
+
+
+def child(mode):
+    t_start = time.perf_counter()
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+    result = {"mode": mode}
+    if mode == "warm":
+        import serve
+
+        serve.warm_up()
+    result["ready_s"] = time.perf_counter() - t_start
+
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=60)
+    t0 = time.perf_counter()
+    at.run()
+    result["first_paint_s"] = time.perf_counter() - t0
+    result["heavy_after_intro"] = [name for name in HEAVY if name in sys.modules]
+
+    at.switch_page("phases/phase1.py")
+    t0 = time.perf_counter()
+    at.run()
+    result["phase1_s"] = time.perf_counter() - t0
+
+    from common import BANK
+    from ledger import ScoreLedger
+
+    ledger = ScoreLedger()
+    for qid in BANK.questions:
+        for rank in (range(1, len(BANK.question(qid)["ranks"]) + 1) if BANK.question(qid)["type"] == "rank" else (0,)):
+            oid = BANK.option_ids(qid)[rank]
+            s = BANK.score(qid, oid, rank)
+            ledger.record(qid, BANK.option_code(qid, oid), s.dx, s.dy, rank)
+    at.session_state.ledger = ledger
+    at.switch_page("phases/phase5.py")
+    t0 = time.perf_counter()
+    at.run()
+    result["phase5_s"] = time.perf_counter() - t0
+    if at.exception:
+        result["error"] = at.exception[0].value
+    print(json.dumps(result))
+
+
+def run_child(mode, env):
+    out = subprocess.run([sys.executable, __file__, "--child", mode], env=env, capture_output=True, text=True,
+                         check=True, cwd=ROOT)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_health(cmd, env, timeout=60):
+    port = free_port()
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([*cmd, "--server.port", str(port), "--server.headless", "true"], env=env, cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - t0 < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - t0
+            except OSError:
+                time.sleep(0.05)
+        return None
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summarize(runs):
+    keys = [k for k, v in runs[0].items() if isinstance(v, float)]
+    return {k: statistics.median(r[k] for r in runs) for k in keys} | {
+        "heavy_after_intro": runs[0].get("heavy_after_intro"),
+        "errors": [r["error"] for r in runs if "error" in r],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--server", action="store_true", help="另外量測伺服器到健康檢查回應的時間")
+    parser.add_argument("--child", choices=["cold", "warm"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        child(args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, CTOS_DB_PATH=str(Path(tmp) / "startup.sqlite3"), STREAMLIT_LOGGER_LEVEL="error",
+                   STREAMLIT_BROWSER_GATHER_USAGE_STATS="false")
+        result = {mode: summarize([run_child(mode, env) for _ in range(args.repeat)]) for mode in ("cold", "warm")}
+        if args.server:
+            result["server_health_s"] = {
+                "streamlit_run": time_to_health([sys.executable, "-m", "streamlit", "run", "app.py"], env),
+                "serve_py": time_to_health([sys.executable, "serve.py"], env),
+            }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
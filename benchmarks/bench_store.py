@@ -0,0 +1,115 @@
+"""量測 update_axes 寫入資料庫所增加的延遲。
+
+模擬多個 session 同時作答：每個執行緒代表一位受測者，重複呼叫
+ScoreLedger.record + ResponseStore.record_answer，再加上 checkpoint()
+寫入檢查點 (sqlite 與 file 兩種 SessionStore)，即 update_axes 的完整工作；
+並與「每次點擊直接同步寫入 SQLite」的做法比較。
+
+用法：python benchmarks/bench_store.py [--sessions 64] [--answers 200]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ledger import ScoreLedger  # noqa: E402
+from session_store import FileSessionStore, SQLiteSessionStore  # noqa: E402
+from store import _INSERT_SQL, ResponseStore, _connect  # noqa: E402
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def run_sessions(n_sessions, n_answers, record):
+    latencies = []
+    lock = threading.Lock()
+
+    def session(i):
+        ledger = ScoreLedger()
+        local = []
+        for j in range(n_answers):
+            qid = f"Q{j % 12}"
+            t0 = time.perf_counter_ns()
+            ledger.record(qid, j % 4, 1.0, -1.0)
+            record(f"{i:032x}", qid, j % 4, ledger)
+            local.append(time.perf_counter_ns() - t0)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(n_sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "p50_us": percentile(latencies, 0.50) / 1000,
+        "p99_us": percentile(latencies, 0.99) / 1000,
+        "max_us": latencies[-1] / 1000,
+        "calls_per_s": len(latencies) / elapsed,
+    }
+
+
+def checkpoint_state(ledger):
+    # 與 common.checkpoint() 相同的狀態內容
+    return {"bank_version": "bench", "answers": [[qid, rank, str(code)] for qid, rank, code, _, _ in ledger.entries()],
+            "last_result_key": None}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--answers", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResponseStore(Path(tmp) / "queued.sqlite3")
+        queued = run_sessions(args.sessions, args.answers,
+                              lambda sid, qid, code, ledger: store.record_answer(sid, qid, 0, code, 1.0, -1.0, "bench"))
+        t0 = time.perf_counter()
+        store.flush()
+        queued["drain_s"] = time.perf_counter() - t0
+
+        checkpoints = {}
+        for kind, sessions in (("sqlite", SQLiteSessionStore(store)),
+                               ("file", FileSessionStore(Path(tmp) / "sessions"))):
+            def record(sid, qid, code, ledger, sessions=sessions):
+                store.record_answer(sid, qid, 0, code, 1.0, -1.0, "bench")
+                sessions.save(sid, checkpoint_state(ledger))
+
+            checkpoints[kind] = run_sessions(args.sessions, args.answers, record)
+            t0 = time.perf_counter()
+            store.flush()
+            if kind == "file":
+                sessions.flush()
+            checkpoints[kind]["drain_s"] = time.perf_counter() - t0
+        store.close()
+
+        sync_store = ResponseStore(Path(tmp) / "sync.sqlite3")
+        sync_store.close()
+        conn = _connect(sync_store.path)
+        conn_lock = threading.Lock()
+
+        def sync_record(sid, qid, code, ledger):
+            with conn_lock, conn:
+                conn.execute(_INSERT_SQL["answer"], (sid, qid, 0, code, 1.0, -1.0, "bench", time.time()))
+
+        synchronous = run_sessions(args.sessions, args.answers, sync_record)
+        conn.close()
+
+    print(json.dumps({"sessions": args.sessions, "answers_per_session": args.answers,
+                      "write_behind": queued, "write_behind_with_checkpoint": checkpoints,
+                      "synchronous": synchronous}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
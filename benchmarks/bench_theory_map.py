@@ -0,0 +1,74 @@
+"""比較 Phase 5 理論地圖每次重繪的規格建立與序列化時間。
+
+before：每次 rerun 重建 DataFrame、分層圖表並整份序列化 (舊做法)
+after ：theory_map.render_spec 只替換具名資料集，背景規格每個行程建立一次
+
+用法：python benchmarks/bench_theory_map.py [--repeat 200]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import altair as alt
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import theory_map  # noqa: E402
+
+
+def before(x, y):
+    source = pd.DataFrame({'X': [x], 'Y': [y], 'Label': ['您的位置']})
+    quadrants = pd.DataFrame({
+        'x': [8, -8, -8, 8],
+        'y': [8, 8, -8, -8],
+        'text': ['I. 認知行為\n(客觀/理性)', 'II. 心理動力\n(主觀/理性)', 'III. 人本體驗\n(主觀/感性)', 'IV. 系統策略\n(客觀/行動)']
+    })
+    base = alt.Chart(source).encode(
+        x=alt.X('X', scale=alt.Scale(domain=[-20, 20]), title='主觀建構 <---> 客觀實證'),
+        y=alt.Y('Y', scale=alt.Scale(domain=[-20, 20]), title='情感體驗 <---> 理性分析')
+    )
+    rules = alt.Chart(pd.DataFrame({'x': [0], 'y': [0]})).mark_rule(color='gray', strokeDash=[4,4]).encode(x='x', y='y')
+    text = alt.Chart(quadrants).mark_text(fontSize=16, color='#95a5a6').encode(x='x', y='y', text='text')
+    points = base.mark_circle(size=500, color='#e74c3c').encode(tooltip=['Label', 'X', 'Y'])
+    return (text + rules + points).properties(width=700, height=600).interactive().to_dict()
+
+
+def after(x, y):
+    return theory_map.render_spec(x, y)
+
+
+def measure(fn, repeat):
+    build = serialize = 0.0
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        spec = fn(i * 0.25 - 10, 5.0)
+        t1 = time.perf_counter()
+        json.dumps(spec)
+        t2 = time.perf_counter()
+        build += t1 - t0
+        serialize += t2 - t1
+    return {"build_ms": build / repeat * 1000, "serialize_ms": serialize / repeat * 1000}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    theory_map.base_spec()
+    first_build_ms = (time.perf_counter() - t0) * 1000
+    result = {
+        "repeat": args.repeat,
+        "before": measure(before, args.repeat),
+        "after": measure(after, args.repeat),
+        "after_first_build_ms": first_build_ms,
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
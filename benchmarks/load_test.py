@@ -0,0 +1,297 @@
+"""整份問卷流程的並行負載測試。
+
+以 Streamlit 的無頭測試工具 (streamlit.testing.v1.AppTest) 模擬完整的受測者旅程：
+Phase 1 三題與確認按鈕、Phase 2 情境題、Phase 3 陰影排序下拉選單、
+Phase 4 座位配置按鈕，最後開啟 Phase 5 報告。
+
+AppTest 不是執行緒安全的 (腳本執行器與 session 狀態綁在行程層級)，因此每位並行的受測者
+各自在一個 worker 行程中依序執行旅程；worker 先跑一次暖機旅程 (匯入模組、建立 cache_resource)，
+全部就緒後才開始計時。所有 worker 共用同一個 SQLite 資料庫。
+
+記錄每次 rerun 的延遲百分位數 (整體與各階段)、各 worker 行程的 RSS (暖機後基準與峰值)，
+以及吞吐量，輸出為 JSON；加上 --compare 可與先前的結果 (例如上一個 commit) 比較。
+因為每個 session 佔一個行程，RSS 總和會高於正式部署 (一個 Streamlit 行程服務所有 session)；
+per_session_mb 是 worker 在暖機後執行旅程時的平均增量。
+預設使用暫存目錄中的資料庫，不會寫入 data/。
+
+用法：
+    python benchmarks/load_test.py --sessions 16 --journeys 64 -o load.json
+    python benchmarks/load_test.py --compare load_before.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "app.py"
+
+sys.path.insert(0, str(ROOT))
+# 無頭執行時會警告缺少 ScriptRunContext，只保留錯誤訊息 (spawn 的 worker 會繼承環境變數)
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+
+class RssSampler:
+    """背景取樣行程的常駐記憶體 (Linux 讀 /proc，其他平台退回 ru_maxrss)。"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = self.baseline = self.current()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    @staticmethod
+    def current():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:
+            scale = 1 if sys.platform == "darwin" else 1024
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+class Journey:
+    """一位受測者從進入 app 到 Phase 5 報告的完整操作。"""
+
+    def __init__(self, bank, seed, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.bank = bank
+        self.rng = random.Random(seed)
+        self.at = AppTest.from_file(str(APP), default_timeout=timeout)
+        self.latencies = defaultdict(list)
+
+    def _run(self, phase, action=None):
+        t0 = time.perf_counter()
+        if action is None:
+            self.at.run()
+        else:
+            action.run()
+        self.latencies[phase].append(time.perf_counter() - t0)
+        if self.at.exception:
+            raise RuntimeError(f"{phase}: {self.at.exception[0].value}")
+
+    def _button(self, label):
+        return next(b for b in self.at.button if b.label == label)
+
+    def _radio(self, qid, key=None):
+        if key is not None:
+            return self.at.radio(key=key)
+        prompt = self.bank.question(qid)["prompt"]
+        return next(r for r in self.at.radio if r.label == prompt)
+
+    def _choose(self, phase, qid, key=None):
+        self._run(phase, self._radio(qid, key).set_value(self.rng.choice(self.bank.option_ids(qid))))
+
+    def _go(self, page):
+        self.at.switch_page(f"phases/{page}.py")
+        self._run(page)
+
+    def run(self):
+        self._run("start")
+
+        self._go("phase1")
+        self._choose("phase1", "P1-Q1")
+        self._run("phase1", self._button("確認 Q1").click())
+        self._choose("phase1", "P1-Q2")
+        self._run("phase1", self._button("確認 Q2").click())
+        q3 = self.bank.question("P1-Q3")
+        self._run("phase1", self.at.slider[0].set_value(self.rng.randint(q3["min"], q3["max"])))
+        self._run("phase1", self._button("確認 Q3 校準").click())
+
+        self._go("phase2")
+        for qid in ("P2-Q1", "P2-Q2", "P2-Q3"):
+            self._choose("phase2", qid, key=f"s2_{qid[-2:].lower()}")
+        self._run("phase2", self._button("確認 Phase 2 所有回答").click())
+
+        self._go("phase3")
+        shadows = self.rng.sample(self.bank.option_ids("P3-Q1"), 2)
+        for rank, oid in enumerate(shadows, start=1):
+            self._run("phase3", self.at.selectbox(key=f"p3_shadow_{rank}").set_value(oid))
+        self._choose("phase3", "P3-Q2", key="p3_process_fear")
+        self._run("phase3", self._button("確認 Phase 3 所有回答").click())
+
+        self._go("phase4")
+        layout = self.rng.choice(self.bank.option_ids("P4-Q1"))
+        self._run("phase4", self._button(self.bank.option_text("P4-Q1", layout)).click())
+        self._choose("phase4", "P4-Q2")
+        self._run("phase4", self._button("確認 Q2").click())
+
+        self._go("phase5")
+        if not len(self.at.session_state.ledger):
+            raise RuntimeError("phase5: 帳本為空")
+        return self.latencies
+
+
+def percentiles(values):
+    if not values:
+        return None
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {"n": len(ordered), "p50_ms": pick(0.50), "p90_ms": pick(0.90), "p99_ms": pick(0.99),
+            "max_ms": ordered[-1] * 1000}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# worker 行程內的狀態 (由 _init_worker 設定)
+_worker = {}
+
+
+def _init_worker(timeout, seed, barrier):
+    from question_bank import load_question_bank
+
+    bank = load_question_bank()
+    Journey(bank, seed - 1 - os.getpid(), timeout).run()
+    _worker.update(bank=bank, timeout=timeout, barrier=barrier, baseline=RssSampler.current())
+
+
+def _ready():
+    """等到所有 worker 都完成暖機；每個 worker 恰好執行一次。"""
+    _worker["barrier"].wait()
+    return os.getpid()
+
+
+def _journey(i, seed):
+    with RssSampler() as rss:
+        try:
+            latencies, error = dict(Journey(_worker["bank"], seed + i, _worker["timeout"]).run()), None
+        except Exception as exc:  # noqa: BLE001 - 記錄後繼續其他旅程
+            latencies, error = {}, f"journey {i}: {exc}"
+    return {"pid": os.getpid(), "latencies": latencies, "error": error,
+            "baseline": _worker["baseline"], "peak": rss.peak}
+
+
+def load_test(sessions, journeys, timeout, seed):
+    import streamlit
+
+    # AppTest 執行 app.py 時會替換 worker 的 __main__，送進 pool 的函式要以模組名稱參照
+    import load_test as worker
+
+    latencies = defaultdict(list)
+    errors = []
+    workers = {}
+
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(sessions, timeout=max(timeout, 60) * 5)
+    with ProcessPoolExecutor(max_workers=sessions, mp_context=ctx, initializer=worker._init_worker,
+                             initargs=(timeout, seed, barrier)) as pool:
+        # 每次 submit 只在沒有閒置 worker 時產生新行程，sessions 個 _ready 會佔滿全部 worker
+        pids = {f.result() for f in [pool.submit(worker._ready) for _ in range(sessions)]}
+        if len(pids) != sessions:
+            raise RuntimeError(f"只有 {len(pids)} 個 worker 就緒")
+
+        t0 = time.perf_counter()
+        for future in as_completed([pool.submit(worker._journey, i, seed) for i in range(journeys)]):
+            result = future.result()
+            if result["error"]:
+                errors.append(result["error"])
+            for phase, values in result["latencies"].items():
+                latencies[phase].extend(values)
+            baseline, peak = workers.get(result["pid"], (result["baseline"], 0))
+            workers[result["pid"]] = (baseline, max(peak, result["peak"]))
+        elapsed = time.perf_counter() - t0
+
+    all_reruns = [v for values in latencies.values() for v in values]
+    completed = journeys - len(errors)
+    baseline = sum(b for b, _ in workers.values())
+    peak = sum(p for _, p in workers.values())
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "sessions": sessions,
+        "journeys": journeys,
+        "completed": completed,
+        "errors": errors[:20],
+        "elapsed_s": elapsed,
+        "throughput": {
+            "journeys_per_s": completed / elapsed,
+            "reruns_per_s": len(all_reruns) / elapsed,
+        },
+        "rerun_latency": percentiles(all_reruns),
+        "phase_latency": {phase: percentiles(values) for phase, values in sorted(latencies.items())},
+        "rss": {
+            "baseline_mb": baseline / 2**20,
+            "peak_mb": peak / 2**20,
+            "per_session_mb": (peak - baseline) / 2**20 / len(workers) if workers else 0.0,
+            "per_process_mb": [{"baseline_mb": b / 2**20, "peak_mb": p / 2**20}
+                               for b, p in sorted(workers.values())],
+        },
+    }
+
+
+def compare(before, after):
+    """列出主要指標的前後差異 (比值 > 1 表示變慢 / 變大)。"""
+    rows = [
+        ("rerun p50 (ms)", before["rerun_latency"]["p50_ms"], after["rerun_latency"]["p50_ms"]),
+        ("rerun p99 (ms)", before["rerun_latency"]["p99_ms"], after["rerun_latency"]["p99_ms"]),
+        ("journeys/s", before["throughput"]["journeys_per_s"], after["throughput"]["journeys_per_s"]),
+        ("peak RSS (MB)", before["rss"]["peak_mb"], after["rss"]["peak_mb"]),
+        ("RSS / session (MB)", before["rss"]["per_session_mb"], after["rss"]["per_session_mb"]),
+    ]
+    lines = [f"{'metric':<20}{before.get('commit') or 'before':>12}{after.get('commit') or 'after':>12}{'ratio':>8}"]
+    for name, old, new in rows:
+        ratio = new / old if old else float("nan")
+        lines.append(f"{name:<20}{old:>12.2f}{new:>12.2f}{ratio:>8.2f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=16, help="同時進行的受測者數")
+    parser.add_argument("--journeys", type=int, default=64, help="完成的旅程總數")
+    parser.add_argument("--timeout", type=float, default=60, help="單次 rerun 的逾時秒數")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="結果 JSON 路徑 (預設印到標準輸出)")
+    parser.add_argument("--compare", help="與先前的結果 JSON 比較")
+    parser.add_argument("--db", help="資料庫路徑 (預設為暫存目錄)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CTOS_DB_PATH"] = args.db or str(Path(tmp) / "load.sqlite3")
+        result = load_test(args.sessions, args.journeys, args.timeout, args.seed)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.compare:
+        print(compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), result), file=sys.stderr)
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
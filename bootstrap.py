@@ -0,0 +1,97 @@
+"""受測者位置的 bootstrap 信賴區域。
+
+座標是十幾個作答位置 (dx, dy) 的總和。將這些題目貢獻「有放回地」重抽數千次，
+以一次 NumPy 索引與加總取得所有重抽樣本的座標，據此估計：
+各象限的機率、重抽座標的共變異數，以及對應的信賴橢圓。
+隨機種子由作答組合決定，同一份作答每次重繪得到相同結果。
+"""
+import zlib
+
+import numpy as np
+
+from ledger import QUADRANT_LABELS
+from scoring import quadrants
+
+N_BOOT = 4000
+# 最可能的象限機率達此值時視為定位穩定
+STABLE_PROBABILITY = 0.8
+# 作答位置少於此數時不判斷定位穩定度
+MIN_ANSWERS = 6
+# 自由度 2 的卡方分位數 (95%)
+CHI2_95 = 5.991464547107979
+
+
+def bootstrap_position(dx, dy, n_boot=N_BOOT, seed=None):
+    """重抽題目貢獻，回傳重抽座標與摘要統計。
+
+    dx, dy：各作答位置在 X、Y 軸上的貢獻。回傳 dict：
+    xs, ys (重抽座標)、quadrant_prob {象限: 機率}、mean、cov (2x2)。
+    """
+    dx = np.asarray(dx, dtype=np.float64)
+    dy = np.asarray(dy, dtype=np.float64)
+    k = len(dx)
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, k, size=(n_boot, k))
+    xs = dx[idx].sum(axis=1)
+    ys = dy[idx].sum(axis=1)
+    counts = np.bincount(quadrants(xs, ys), minlength=len(QUADRANT_LABELS))
+    return {
+        "xs": xs,
+        "ys": ys,
+        "quadrant_prob": {q: float(counts[q] / n_boot) for q in QUADRANT_LABELS},
+        "mean": (float(xs.mean()), float(ys.mean())),
+        "cov": np.cov(xs, ys),
+    }
+
+
+def confidence_ellipse(center, cov, chi2=CHI2_95, n_points=72):
+    """回傳信賴橢圓的頂點 [{X, Y, order}]，首尾相接以便畫成封閉折線。"""
+    eigval, eigvec = np.linalg.eigh(cov)
+    radii = np.sqrt(np.clip(eigval, 0.0, None) * chi2)
+    t = np.linspace(0.0, 2 * np.pi, n_points + 1)
+    circle = np.stack([np.cos(t), np.sin(t)])
+    pts = eigvec @ (radii[:, None] * circle)
+    cx, cy = center
+    return [{"X": float(cx + px), "Y": float(cy + py), "order": i} for i, (px, py) in enumerate(pts.T)]
+
+
+def dominant_quadrant(quadrant_prob):
+    """回傳 (最可能的象限, 機率, 是否穩定)；不計座標軸上的 0。
+
+    重抽全部落在座標軸上時沒有最可能的象限，回傳 (None, 0.0, False)。
+    """
+    top = max(range(1, 5), key=quadrant_prob.get)
+    if quadrant_prob[top] == 0:
+        return None, 0.0, False
+    return top, quadrant_prob[top], quadrant_prob[top] >= STABLE_PROBABILITY
+
+
+def stability_verdict(quadrant_prob, n_answers):
+    """Phase 5 與報告共用的穩定度判定，回傳 (是否穩定, 標題, 說明)。
+
+    作答位置少於 MIN_ANSWERS 時不下穩定判定：題數太少時重抽幾乎不會改變象限
+    (例如只有兩題且同號時必定 100%)，那只是重抽的雜訊，不代表定位確定。
+    """
+    top, top_prob, stable = dominant_quadrant(quadrant_prob)
+    if top is None:
+        return False, "尚無法定位", "重抽您的作答後全部落在座標軸上，目前無法判斷取向；完成更多題目後再查看。"
+    if n_answers < MIN_ANSWERS:
+        return False, "作答題數不足", (f"目前只作答 {n_answers} 題，至少需要 {MIN_ANSWERS} 題才能判斷定位穩定度；"
+                                       f"目前最常落在「{QUADRANT_LABELS[top]}」({top_prob:.0%})。")
+    if stable:
+        return True, "定位穩定", f"重抽您的作答 {N_BOOT:,} 次，有 {top_prob:.0%} 落在「{QUADRANT_LABELS[top]}」。"
+    return False, "取向分散", (f"重抽您的作答 {N_BOOT:,} 次，最常落在「{QUADRANT_LABELS[top]}」({top_prob:.0%})，"
+                               "其餘分佈於其他取向，顯示您可能正在發展一種折衷/整合的取向。")
+
+
+def ledger_region(ledger, n_boot=N_BOOT):
+    """以帳本中的題目貢獻計算 bootstrap，種子取自 answer_key。"""
+    # 依作答位置排序，結果只取決於作答組合，與作答順序無關
+    entries = sorted(ledger.entries())
+    dx = [e[3] for e in entries]
+    dy = [e[4] for e in entries]
+    seed = zlib.crc32(ledger.answer_key().encode("utf-8"))
+    result = bootstrap_position(dx, dy, n_boot=n_boot, seed=seed)
+    # 橢圓以實際座標為中心 (重抽平均的期望值即為實際座標)
+    result["ellipse"] = confidence_ellipse((ledger.x, ledger.y), result["cov"])
+    return result
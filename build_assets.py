@@ -0,0 +1,64 @@
+"""建置 Phase 1 角色圖片的本地縮圖。
+
+用法：
+    python build_assets.py                  # 從題庫中的 image_url 下載原圖
+    python build_assets.py --source-dir DIR # 離線匯入 DIR/<選項ID>.{jpg,png,webp}
+
+輸出為 assets/img/<題號>_<選項ID>.webp，寬度預設為頁面欄寬 (500px)。
+需要 Pillow (streamlit 已附帶)。
+"""
+import argparse
+import io
+import sys
+import urllib.request
+from pathlib import Path
+
+from PIL import Image
+
+from assets import IMAGE_DIR, ROLE_IMAGE_QUESTION, role_image_path
+from question_bank import load_question_bank
+
+SOURCE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp")
+
+
+def read_source(option, source_dir, timeout):
+    if source_dir is not None:
+        for suffix in SOURCE_SUFFIXES:
+            path = Path(source_dir) / f"{option['id']}{suffix}"
+            if path.exists():
+                return path.read_bytes()
+        raise FileNotFoundError(f"{source_dir} 中找不到選項 {option['id']} 的圖片")
+    with urllib.request.urlopen(option["image_url"], timeout=timeout) as resp:
+        return resp.read()
+
+
+def make_thumbnail(raw, width, quality):
+    img = Image.open(io.BytesIO(raw)).convert("RGB")
+    if img.width > width:
+        img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+    out = io.BytesIO()
+    img.save(out, "WEBP", quality=quality, method=6)
+    return out.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source-dir", help="離線匯入原圖的資料夾")
+    parser.add_argument("--width", type=int, default=500, help="縮圖寬度 (px)")
+    parser.add_argument("--quality", type=int, default=80, help="WebP 品質 (0-100)")
+    parser.add_argument("--timeout", type=float, default=20.0, help="下載逾時秒數")
+    args = parser.parse_args(argv)
+
+    bank = load_question_bank()
+    IMAGE_DIR.mkdir(parents=True, exist_ok=True)
+    for option in bank.question(ROLE_IMAGE_QUESTION)["options"]:
+        raw = read_source(option, args.source_dir, args.timeout)
+        data = make_thumbnail(raw, args.width, args.quality)
+        path = role_image_path(ROLE_IMAGE_QUESTION, option["id"])
+        path.write_bytes(data)
+        print(f"{path} ({len(raw):,} B -> {len(data):,} B)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
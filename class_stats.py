@@ -0,0 +1,114 @@
+"""教師儀表板使用的班級即時統計。
+
+以資料庫的 answers.id / results.id 為水位，每次 refresh 只讀取新增的列，
+並以計數器增量更新：同一位學生重新作答時先扣除舊選項 / 舊結果再加入新的，
+因此更新成本與「變動的作答數」成正比，而不是重掃所有學生的作答。
+每次有變動時 version 加一，畫面可據此判斷是否需要重繪。
+選項代碼是選項在題庫中的位置，只統計與目前題庫同版本的作答；
+結果的座標與旗標不依賴選項順序，不同版本仍可合併。
+"""
+import threading
+from collections import defaultdict
+
+from ledger import quadrant_of
+
+
+class ClassAggregate:
+    def __init__(self, bank_version=None):
+        self.bank_version = bank_version
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.version = 0
+        self.start_result_id = 0
+        self.last_answer_id = 0
+        self.last_result_id = 0
+        self._answer_code = {}
+        self._students = set()
+        self.option_counts = defaultdict(lambda: defaultdict(int))
+        self._session_result = {}
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+        self.quadrant_counts = [0] * 5
+        self.inconsistent = 0
+        self.random = 0
+
+    @property
+    def n_results(self):
+        return len(self._session_result)
+
+    # --- 增量更新 ---
+    def _apply_answer(self, session_id, qid, rank, code):
+        key = (session_id, qid, rank)
+        old = self._answer_code.get(key)
+        if old == code:
+            return
+        if old is not None:
+            self.option_counts[(qid, rank)][old] -= 1
+        self.option_counts[(qid, rank)][code] += 1
+        self._answer_code[key] = code
+        self._students.add(session_id)
+
+    def _apply_result(self, session_id, x, y, is_inconsistent, is_random):
+        new = (x, y, quadrant_of(x, y), is_inconsistent, is_random)
+        old = self._session_result.get(session_id)
+        for entry, sign in ((old, -1), (new, 1)):
+            if entry is None:
+                continue
+            ex, ey, quadrant, inc, rnd = entry
+            self.sum_x += sign * ex
+            self.sum_y += sign * ey
+            self.quadrant_counts[quadrant] += sign
+            self.inconsistent += sign * inc
+            self.random += sign * rnd
+        self._session_result[session_id] = new
+
+    def refresh(self, response_store):
+        """讀取水位之後的新資料，回傳處理的列數。"""
+        conn = response_store.reader()
+        version_filter = "" if self.bank_version is None else " AND bank_version = ?"
+        with self._lock:
+            params = [self.last_answer_id] + ([] if self.bank_version is None else [self.bank_version])
+            answers = conn.execute(
+                "SELECT id, session_id, question_id, rank, option_code FROM answers"
+                f" WHERE id > ?{version_filter} ORDER BY id", params).fetchall()
+            results = conn.execute(
+                "SELECT id, session_id, x, y, is_inconsistent, is_random FROM results WHERE id > ? ORDER BY id",
+                (self.last_result_id,)).fetchall()
+            for row_id, session_id, qid, rank, code in answers:
+                self._apply_answer(session_id, qid, rank, code)
+                self.last_answer_id = row_id
+            for row_id, session_id, x, y, inc, rnd in results:
+                self._apply_result(session_id, x, y, inc, rnd)
+                self.last_result_id = row_id
+            if answers or results:
+                self.version += 1
+        return len(answers) + len(results)
+
+    def reset(self, response_store):
+        """清空統計並把水位移到目前最新的資料 (開始新的一堂課)。"""
+        conn = response_store.reader()
+        with self._lock:
+            version = self.version
+            self._clear()
+            self.version = version + 1
+            self.last_answer_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM answers").fetchone()[0]
+            self.last_result_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM results").fetchone()[0]
+            self.start_result_id = self.last_result_id
+
+    # --- 讀取 ---
+    def snapshot(self):
+        with self._lock:
+            n = self.n_results
+            return {
+                "version": self.version,
+                "n_results": n,
+                "n_students": len(self._students),
+                "mean_x": self.sum_x / n if n else 0.0,
+                "mean_y": self.sum_y / n if n else 0.0,
+                "quadrant_counts": list(self.quadrant_counts),
+                "inconsistent_share": self.inconsistent / n if n else 0.0,
+                "random_share": self.random / n if n else 0.0,
+                "option_counts": {key: dict(counts) for key, counts in self.option_counts.items()},
+            }
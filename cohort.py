@@ -0,0 +1,78 @@
+"""全體受測者在理論地圖上的密度格網。
+
+固定在 [-20, 20] 的座標範圍上切成等寬方格，以 NumPy 向量化累加計數；
+每次 refresh 只讀取資料庫中上次之後新增的結果 (以 results.id 為水位)，
+同一位受測者只計入最新一筆結果。圖表只需傳送非零的方格，
+資料量上限為方格數，與受測者人數無關。
+"""
+import threading
+import time
+
+import numpy as np
+
+DOMAIN = (-20.0, 20.0)
+
+
+class CohortGrid:
+    def __init__(self, bins=40, domain=DOMAIN):
+        self.bins = bins
+        self.lo, self.hi = domain
+        self.width = (self.hi - self.lo) / bins
+        self.edges = np.linspace(self.lo, self.hi, bins + 1)
+        self.counts = np.zeros((bins, bins), dtype=np.int64)
+        self.last_id = 0
+        self.last_refresh = 0.0
+        self._session_cell = {}
+        self._lock = threading.Lock()
+
+    @property
+    def total(self):
+        return len(self._session_cell)
+
+    def cell_index(self, xs, ys):
+        ix = np.clip(((np.asarray(xs, dtype=np.float64) - self.lo) // self.width).astype(np.intp), 0, self.bins - 1)
+        iy = np.clip(((np.asarray(ys, dtype=np.float64) - self.lo) // self.width).astype(np.intp), 0, self.bins - 1)
+        return ix, iy
+
+    def add(self, session_ids, xs, ys):
+        """加入一批結果；同一 session 先前的位置會被取代 (批次內以最後一筆為準)。"""
+        latest = dict(zip(session_ids, zip(xs, ys)))
+        session_ids = list(latest)
+        xs, ys = zip(*latest.values()) if latest else ((), ())
+        ix, iy = self.cell_index(xs, ys)
+        with self._lock:
+            old = [self._session_cell.get(sid) for sid in session_ids]
+            stale = [cell for cell in old if cell is not None]
+            if stale:
+                sx, sy = zip(*stale)
+                np.subtract.at(self.counts, (np.asarray(sx), np.asarray(sy)), 1)
+            np.add.at(self.counts, (ix, iy), 1)
+            self._session_cell.update(zip(session_ids, zip(ix.tolist(), iy.tolist())))
+
+    def refresh(self, response_store, min_interval=5.0):
+        """從資料庫讀取新增的結果；距上次更新不足 min_interval 秒時略過。"""
+        now = time.monotonic()
+        if now - self.last_refresh < min_interval:
+            return 0
+        self.last_refresh = now
+        rows = response_store.reader().execute(
+            "SELECT id, session_id, x, y FROM results WHERE id > ? ORDER BY id", (self.last_id,)
+        ).fetchall()
+        if rows:
+            ids, sids, xs, ys = zip(*rows)
+            self.add(sids, xs, ys)
+            self.last_id = ids[-1]
+        return len(rows)
+
+    def cells(self):
+        """回傳非零方格：{x, x2, y, y2, count} 欄位的 dict (可直接轉為 DataFrame)。"""
+        with self._lock:
+            ix, iy = np.nonzero(self.counts)
+            count = self.counts[ix, iy]
+        return {
+            "x": self.edges[ix],
+            "x2": self.edges[ix + 1],
+            "y": self.edges[iy],
+            "y2": self.edges[iy + 1],
+            "count": count,
+        }
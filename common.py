@@ -0,0 +1,114 @@
+"""各階段頁面共用的 session state、計分與資源載入。"""
+import uuid
+
+import streamlit as st
+
+import assets
+import metrics
+from ledger import ScoreLedger, rebuild_ledger
+from question_bank import load_question_bank
+from session_store import create_session_store
+from store import ResponseStore
+
+
+# --- 題庫 (每個行程只載入、驗證一次) ---
+@st.cache_resource
+def get_question_bank():
+    return load_question_bank()
+
+BANK = get_question_bank()
+
+# --- 作答資料庫 (每個行程共用一個背景寫入執行緒) ---
+@st.cache_resource
+def get_response_store():
+    return ResponseStore()
+
+STORE = get_response_store()
+
+# --- 作答進度檢查點 (可在不同副本間以 resume token 還原) ---
+@st.cache_resource
+def get_session_store():
+    return create_session_store(STORE)
+
+SESSIONS = get_session_store()
+
+# --- 執行期量測匯出 (CTOS_METRICS_PORT / CTOS_METRICS_FILE，見 metrics.py) ---
+@st.cache_resource
+def get_metrics_exporters():
+    return metrics.start_exporters()
+
+get_metrics_exporters()
+
+def checkpoint():
+    # 以選項 ID 儲存：題庫改版調整或插入選項後，選項代碼 (位置) 會改變，ID 不會
+    SESSIONS.save(st.session_state.session_id, {
+        "bank_version": BANK.version,
+        "answers": [[qid, rank, BANK.option_id(qid, code)]
+                    for qid, rank, code, _, _ in st.session_state.ledger.entries()],
+        "last_result_key": st.session_state.get('last_result_key'),
+    })
+
+def restore_ledger(state):
+    same_bank = state.get("bank_version") == BANK.version
+    answers = []
+    for qid, rank, option in state.get("answers", []):
+        if isinstance(option, int):
+            # 舊格式的檢查點存的是選項代碼，只在題庫版本相同時才能對應
+            if same_bank:
+                answers.append((qid, rank, option))
+            continue
+        try:
+            answers.append((qid, rank, BANK.option_code(qid, option)))
+        except KeyError:
+            continue  # 題庫改版後已不存在的題目或選項
+    return rebuild_ledger(BANK, answers)
+
+# --- Session State 初始化 ---
+def init_session_state():
+    if 'session_id' not in st.session_state:
+        token = st.query_params.get("resume")
+        state = SESSIONS.load(token) if token else None
+        if state is not None:
+            st.session_state.session_id = token
+            st.session_state.ledger = restore_ledger(state)
+            st.session_state.last_result_key = state.get("last_result_key")
+        else:
+            st.session_state.session_id = uuid.uuid4().hex
+    if 'ledger' not in st.session_state:
+        st.session_state.ledger = ScoreLedger()
+    if st.query_params.get("resume") != st.session_state.session_id:
+        st.query_params["resume"] = st.session_state.session_id
+
+# --- 輔助函數 ---
+def update_axes(x_delta, y_delta, phase, code, rank=0):
+    # 同一題 (同一名次) 重複送出時取代舊答案
+    st.session_state.ledger.record(phase, code, x_delta, y_delta, rank)
+    metrics.UPDATE_AXES.inc(phase)
+    STORE.record_answer(st.session_state.session_id, phase, rank, code, x_delta, y_delta, BANK.version)
+    checkpoint()
+
+def record_result(ledger):
+    # 作答組合改變時才寫入新的 Phase 5 結果
+    key = ledger.answer_key()
+    if st.session_state.get('last_result_key') == key:
+        return
+    st.session_state.last_result_key = key
+    is_inconsistent, is_random = ledger.flags()
+    STORE.record_result(st.session_state.session_id, ledger.x, ledger.y, ledger.var_x, ledger.var_y,
+                        is_inconsistent, is_random, key, BANK.version)
+    checkpoint()
+
+def record_answer(qid, option_id, rank=0):
+    s = BANK.score(qid, option_id, rank)
+    update_axes(s.dx, s.dy, qid, BANK.option_code(qid, option_id), rank)
+
+def option_radio(qid, **kwargs):
+    return st.radio(BANK.question(qid)["prompt"], BANK.option_ids(qid),
+                    format_func=lambda oid: BANK.option_text(qid, oid), **kwargs)
+
+# --- 靜態資源 (樣式、工具卡片、角色圖片；每個行程只讀取一次) ---
+@st.cache_resource
+def get_asset_bundle():
+    return assets.build_bundle(BANK, st.get_option("server.enableStaticServing"))
+
+ASSETS = get_asset_bundle()
@@ -0,0 +1,34 @@
+"""列舉全部作答組合，建立 Phase 5 使用的預先計算結果表。
+
+用法：
+    python enumerate_outcomes.py            # 建立 data/outcomes.bin 並輸出統計
+    python enumerate_outcomes.py --stats    # 只讀取現有結果表的統計
+"""
+import argparse
+import json
+import sys
+import time
+
+from outcome_table import DEFAULT_TABLE_PATH, OutcomeTable, build
+from question_bank import load_question_bank
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", default=DEFAULT_TABLE_PATH, help="結果表路徑")
+    parser.add_argument("--stats", action="store_true", help="不重建，只輸出現有結果表的統計")
+    args = parser.parse_args(argv)
+
+    if args.stats:
+        stats = OutcomeTable(args.output).stats
+    else:
+        t0 = time.perf_counter()
+        stats = build(load_question_bank(), args.output)
+        print(f"已寫入 {args.output} ({stats['combinations']:,} 種組合, {time.perf_counter() - t0:.1f}s)",
+              file=sys.stderr)
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
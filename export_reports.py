@@ -0,0 +1,54 @@
+"""匯出全班 (或全部受測者) 的 Phase 5 報告為一個 zip，每位受測者一個檔案。
+
+只匯出目前題庫版本的結果：舊版本的作答代碼無法以現行題庫重建，會略過並列出筆數。
+
+相同作答組合只繪製一次，並以行程池平行繪製；已繪製過的報告直接取自快取
+(見 report.py 的 CTOS_REPORT_CACHE_DIR)。
+檔名為結果編號 (report-<result_id>.png …)，不含可還原作答的 resume token；
+zip 內的 manifest.csv 列出每個檔案的結果編號與完成時間。
+
+用法：python export_reports.py -o reports.zip [--format pdf] [--workers 8] [--db data/ctos.sqlite3]
+"""
+import argparse
+import os
+import sys
+import time
+
+from question_bank import load_question_bank
+from report import FORMATS, ReportFontError, export_zip, latest_results
+from store import ResponseStore
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", required=True, help="輸出的 zip 檔")
+    parser.add_argument("--format", choices=FORMATS, default="png")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="行程數 (1 表示不使用行程池)")
+    parser.add_argument("--db", help="作答資料庫路徑 (預設同 CTOS_DB_PATH)")
+    args = parser.parse_args(argv)
+
+    bank = load_question_bank()
+    store = ResponseStore(args.db)
+    results = latest_results(store, bank.version)
+    skipped = store.reader().execute(
+        "SELECT COUNT(DISTINCT session_id) FROM results WHERE bank_version != ?"
+        " AND session_id NOT IN (SELECT session_id FROM results WHERE bank_version = ?)",
+        (bank.version, bank.version),
+    ).fetchone()[0]
+    store.close()
+    if skipped:
+        print(f"略過 {skipped} 位受測者在其他題庫版本的結果 (目前版本 {bank.version})", file=sys.stderr)
+
+    t0 = time.perf_counter()
+    try:
+        count = export_zip(bank, results, args.output, fmt=args.format, workers=args.workers)
+    except ReportFontError as e:
+        parser.error(str(e))
+    unique = len({key for _, key, _ in results})
+    print(f"已匯出 {count} 份報告 ({unique} 種作答組合)，耗時 {time.perf_counter() - t0:.1f} 秒 -> {args.output}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""匯入已標記取向的參照受測者，供 Phase 5 的最近取向分類使用。
+
+輸入為 CSV / Excel，需有 X、Y 與 orientation 欄 (batch_score.py 的輸出加上一欄標記即可)；
+orientation 為 cbt / psychodynamic / humanistic / systemic / postmodern / expressive 之一。
+
+用法：python import_references.py labeled.csv [--source 2024-supervisors] [--db data/ctos.sqlite3]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from batch_score import EXCEL_SUFFIXES, read_excel
+from orientation import ORIENTATIONS
+from store import ResponseStore
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="CSV 或 Excel 檔")
+    parser.add_argument("--source", help="資料來源標記 (預設為檔名)")
+    parser.add_argument("--db", help="作答資料庫路徑 (預設同 CTOS_DB_PATH)")
+    args = parser.parse_args(argv)
+
+    path = Path(args.input)
+    try:
+        df = read_excel(path) if path.suffix.lower() in EXCEL_SUFFIXES else pd.read_csv(path)
+    except ImportError as e:
+        parser.error(str(e))
+    missing = {"X", "Y", "orientation"} - set(df.columns)
+    if missing:
+        parser.error(f"缺少欄位：{', '.join(sorted(missing))}")
+    df["orientation"] = df["orientation"].astype(str).str.strip().str.lower()
+    unknown = ~df["orientation"].isin(list(ORIENTATIONS))
+    if unknown.any():
+        print(f"略過 {int(unknown.sum())} 列未知的取向：{sorted(df.loc[unknown, 'orientation'].unique())}", file=sys.stderr)
+    df = df[~unknown].dropna(subset=["X", "Y"])
+
+    source = args.source or path.stem
+    store = ResponseStore(args.db)
+    for x, y, orientation in zip(df["X"].astype(float), df["Y"].astype(float), df["orientation"]):
+        store.record_reference(x, y, orientation, source)
+    store.close()
+    print(f"已匯入 {len(df)} 位參照受測者 (來源：{source})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
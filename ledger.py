@@ -0,0 +1,160 @@
+"""以題號為鍵的計分帳本。
+
+每個作答位置 (題號, 名次) 只保留一筆紀錄，重複送出時取代舊答案；
+選項以小整數代碼存放於 array 中，並累計兩軸總和；變異數在需要時由
+各題貢獻重新計算 (最多十餘筆)，避免增量更新在門檻邊緣累積捨入誤差。
+"""
+import sys
+from array import array
+
+from question_bank import QuestionBankError
+
+# --- 一致性檢測門檻 ---
+INCONSISTENT_VARIANCE = 3.5
+RANDOM_VARIANCE = 5.0
+RANDOM_RADIUS = 2
+# 比較門檻前先四捨五入到此位數：不同計算順序的捨入誤差 (約 1e-15) 不會改變旗標，
+# 網頁帳本與批次計分引擎 (scoring.py) 因此在門檻上得到相同結果
+VARIANCE_DECIMALS = 9
+
+
+def consistency_flags(x, y, total_variance):
+    """回傳 (is_inconsistent, is_random)。"""
+    total_variance = round(total_variance, VARIANCE_DECIMALS)
+    is_inconsistent = total_variance > INCONSISTENT_VARIANCE
+    is_random = (abs(x) < RANDOM_RADIUS and abs(y) < RANDOM_RADIUS) and total_variance > RANDOM_VARIANCE
+    return is_inconsistent, is_random
+
+
+# --- 象限 ---
+QUADRANT_LABELS = {
+    0: "軸線上 (未分類)",
+    1: "I. 認知行為 (客觀/理性)",
+    2: "II. 心理動力 (主觀/理性)",
+    3: "III. 人本體驗 (主觀/感性)",
+    4: "IV. 系統策略 (客觀/行動)",
+}
+
+
+def quadrant_of(x, y):
+    """回傳象限編號 1-4；落在座標軸上時為 0。"""
+    if x == 0 or y == 0:
+        return 0
+    if y > 0:
+        return 1 if x > 0 else 2
+    return 4 if x > 0 else 3
+
+
+def _variance(values):
+    # 母體變異數 (兩段式)；少於兩筆時視為 0
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean = sum(values) / n
+    return sum((v - mean) ** 2 for v in values) / n
+
+
+class ScoreLedger:
+    """一位受測者的作答帳本。
+
+    record() 以 (題號, 名次) 為鍵；同一鍵再次送出時取代原答案，
+    不會重複計分。code 為選項在題庫中的索引 (見 QuestionBank.option_code)。
+    """
+
+    __slots__ = ("_index", "_keys", "_codes", "_dx", "_dy", "sum_x", "sum_y")
+
+    def __init__(self):
+        self._index = {}
+        self._keys = []
+        self._codes = array("B")
+        self._dx = array("d")
+        self._dy = array("d")
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+
+    def record(self, qid, code, dx, dy, rank=0):
+        key = (qid, rank)
+        pos = self._index.get(key)
+        if pos is None:
+            self._index[key] = len(self._keys)
+            self._keys.append(key)
+            self._codes.append(code)
+            self._dx.append(dx)
+            self._dy.append(dy)
+        else:
+            self.sum_x -= self._dx[pos]
+            self.sum_y -= self._dy[pos]
+            self._codes[pos] = code
+            self._dx[pos] = dx
+            self._dy[pos] = dy
+        self.sum_x += dx
+        self.sum_y += dy
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __sizeof__(self):
+        # 含各欄位陣列與索引，供 session state 大小量測使用
+        return (object.__sizeof__(self) + sys.getsizeof(self._index) + sys.getsizeof(self._keys)
+                + sum(sys.getsizeof(a) for a in (self._codes, self._dx, self._dy)))
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def code(self, qid, rank=0):
+        pos = self._index.get((qid, rank))
+        return None if pos is None else self._codes[pos]
+
+    @property
+    def x(self):
+        return self.sum_x
+
+    @property
+    def y(self):
+        return self.sum_y
+
+    @property
+    def var_x(self):
+        return _variance(self._dx)
+
+    @property
+    def var_y(self):
+        return _variance(self._dy)
+
+    @property
+    def total_variance(self):
+        return self.var_x + self.var_y
+
+    def flags(self):
+        return consistency_flags(self.sum_x, self.sum_y, self.total_variance)
+
+    def answer_key(self):
+        """正規化的作答組合字串 (依題號、名次排序)，相同作答得到相同字串。"""
+        return ";".join(f"{qid}#{rank}={self._codes[pos]}" for (qid, rank), pos in sorted(self._index.items()))
+
+    def entries(self):
+        """依首次作答順序產生 (題號, 名次, 代碼, dx, dy)。"""
+        for pos, (qid, rank) in enumerate(self._keys):
+            yield qid, rank, self._codes[pos], self._dx[pos], self._dy[pos]
+
+
+def parse_answer_key(answer_key):
+    """ScoreLedger.answer_key() 字串 -> [(題號, 名次, 代碼)]。"""
+    answers = []
+    for part in filter(None, answer_key.split(";")):
+        slot, code = part.rsplit("=", 1)
+        qid, rank = slot.rsplit("#", 1)
+        answers.append((qid, int(rank), int(code)))
+    return answers
+
+
+def rebuild_ledger(bank, answers):
+    """以題庫重新計分 (題號, 名次, 代碼) 序列並建立帳本；略過題庫中已不存在的題目或選項。"""
+    ledger = ScoreLedger()
+    for qid, rank, code in answers:
+        try:
+            s = bank.score(qid, bank.option_id(qid, code), rank)
+        except (KeyError, IndexError, QuestionBankError):
+            continue
+        ledger.record(qid, code, s.dx, s.dy, rank)
+    return ledger
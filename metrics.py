@@ -0,0 +1,234 @@
+"""執行期量測：rerun 與區塊計時、作答次數、session 狀態大小與活躍 session 數。
+
+全部以標準函式庫實作，並以 Prometheus 文字格式匯出：
+- CTOS_METRICS_PORT：在該埠啟動 HTTP 端點 (GET /metrics)
+- CTOS_METRICS_FILE：定期寫入文字檔 (node_exporter textfile collector 可直接讀取)
+- CTOS_PROFILE_RATE：以此比例 (0–1) 抽樣 rerun 執行 cProfile，
+  .prof 檔寫入 CTOS_PROFILE_DIR (預設 data/profiles)，可用 snakeviz / flameprof 產生火焰圖
+
+未設定任何環境變數時只在記憶體中累計，每次量測的成本是一次 perf_counter 與一次加鎖累加。
+"""
+import contextlib
+import cProfile
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+DEFAULT_PROFILE_DIR = Path(__file__).with_name("data") / "profiles"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+ACTIVE_WINDOW = 300.0
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{str(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.label_names, k)} {v}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.label_names, k)} {v}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += 1
+            entry[2] += value
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, (list(c), n, s)) for k, (c, n, s) in self._values.items())
+        lines = self.header()
+        for key, (counts, n, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(self.label_names + ('le',), key + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.label_names + ('le',), key + ('+Inf',))} {n}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {n}")
+        return lines
+
+
+# --- 量測項目 ---
+RERUN_SECONDS = Histogram("ctos_rerun_seconds", "整頁 rerun 的執行時間", ("page",))
+BLOCK_SECONDS = Histogram("ctos_block_seconds", "頁面內個別區塊的執行時間", ("block",))
+UPDATE_AXES = Counter("ctos_update_axes_total", "update_axes 呼叫次數 (確認送出的作答)", ("question",))
+SESSION_STATE_BYTES = Histogram("ctos_session_state_bytes", "每次 rerun 結束時 session state 的估計大小",
+                                buckets=SIZE_BUCKETS)
+ACTIVE_SESSIONS = Gauge("ctos_active_sessions", f"最近 {ACTIVE_WINDOW:.0f} 秒內有 rerun 的 session 數")
+PROFILED_RERUNS = Counter("ctos_profiled_reruns_total", "被抽樣執行 cProfile 的 rerun 數", ("page",))
+
+REGISTRY = [RERUN_SECONDS, BLOCK_SECONDS, UPDATE_AXES, SESSION_STATE_BYTES, ACTIVE_SESSIONS, PROFILED_RERUNS]
+
+_last_seen = {}
+_last_seen_lock = threading.Lock()
+
+
+def render():
+    """以 Prometheus 文字格式輸出目前所有量測值。"""
+    now = time.monotonic()
+    with _last_seen_lock:
+        stale = [sid for sid, seen in _last_seen.items() if now - seen > ACTIVE_WINDOW]
+        for sid in stale:
+            del _last_seen[sid]
+        ACTIVE_SESSIONS.set(len(_last_seen))
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- 量測介面 ---
+@contextlib.contextmanager
+def timed(block):
+    """量測區塊執行時間；也可當作裝飾器 (例如套在 fragment 函式上)。"""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        BLOCK_SECONDS.observe(time.perf_counter() - t0, block)
+
+
+def state_size(state):
+    """session state 的估計大小 (各值的 sys.getsizeof 加總)，不做序列化。"""
+    return sum(sys.getsizeof(value) for value in state.values())
+
+
+_profile_rate = float(os.environ.get("CTOS_PROFILE_RATE") or 0)
+_profile_dir = Path(os.environ.get("CTOS_PROFILE_DIR") or DEFAULT_PROFILE_DIR)
+
+
+@contextlib.contextmanager
+def rerun(page, session_id=None, state=None):
+    """量測一次整頁 rerun；依 CTOS_PROFILE_RATE 抽樣執行 cProfile。"""
+    profiler = None
+    if _profile_rate and random.random() < _profile_rate:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        if profiler is not None:
+            profiler.disable()
+            _profile_dir.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(_profile_dir / f"{page}-{time.strftime('%Y%m%d-%H%M%S')}-{int(elapsed * 1000)}ms.prof")
+            PROFILED_RERUNS.inc(page)
+        RERUN_SECONDS.observe(elapsed, page)
+        if session_id is not None:
+            with _last_seen_lock:
+                _last_seen[session_id] = time.monotonic()
+        if state is not None:
+            SESSION_STATE_BYTES.observe(state_size(state))
+
+
+# --- 匯出 ---
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port, host="127.0.0.1"):
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, name="ctos-metrics-http", daemon=True).start()
+    return server
+
+
+def write_textfile(path):
+    # 先寫暫存檔再換名，讀取端不會看到寫到一半的內容
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(render(), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _textfile_loop(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            write_textfile(path)
+        except OSError:
+            pass
+
+
+def start_exporters(port=None, textfile=None, interval=15.0):
+    """依參數或環境變數啟動匯出；回傳已啟動的項目 (每個行程呼叫一次)。"""
+    port = port or os.environ.get("CTOS_METRICS_PORT")
+    textfile = textfile or os.environ.get("CTOS_METRICS_FILE")
+    started = {}
+    if port:
+        started["http"] = serve(int(port), os.environ.get("CTOS_METRICS_HOST", "127.0.0.1"))
+    if textfile:
+        Path(textfile).parent.mkdir(parents=True, exist_ok=True)
+        threading.Thread(target=_textfile_loop, args=(textfile, interval), name="ctos-metrics-file",
+                         daemon=True).start()
+        started["textfile"] = textfile
+    return started
@@ -0,0 +1,184 @@
+"""六大諮商取向的最近鄰分類器。
+
+參照資料包含六個取向的中心點，以及資料庫中已標記取向的參照受測者
+(reference_profiles 表)。參照點依座標放進固定範圍的均勻方格 (方格大小隨人數調整)，
+並以 CSR 方式 (依方格排序的座標陣列 + 各方格起點) 建立索引；
+查詢時由使用者所在方格向外逐圈擴大，直到第 k 個最近點確定為止，
+只需檢查附近的方格，參照人數增加時查詢時間幾乎不變。
+
+新增的參照點先放在緩衝區以暴力法比對，累積到一定數量才合併重建索引，
+因此每次新增的攤銷成本很低。
+"""
+import threading
+import time
+
+import numpy as np
+
+# 取向代號 -> (名稱, 中心點)；中心點對應 Phase 5 第 3 節的象限與中軸說明
+ORIENTATIONS = {
+    "cbt": ("認知行為 CBT/REBT", (8.0, 8.0)),
+    "psychodynamic": ("心理動力 Psychodynamic", (-8.0, 8.0)),
+    "humanistic": ("人本/體驗/完形", (-8.0, -8.0)),
+    "systemic": ("系統/策略/現實", (8.0, -8.0)),
+    "postmodern": ("後現代/敘事", (-10.0, 0.0)),
+    "expressive": ("表達性藝術", (0.0, -10.0)),
+}
+ORIENTATION_KEYS = list(ORIENTATIONS)
+_LABEL_CODE = {key: i for i, key in enumerate(ORIENTATION_KEYS)}
+
+DOMAIN = (-30.0, 30.0)
+# 每個中心點相當於幾位參照受測者
+CENTROID_WEIGHT = 5.0
+# 距離加權的高斯核寬度
+BANDWIDTH = 4.0
+
+
+class OrientationIndex:
+    def __init__(self, domain=DOMAIN, points_per_cell=8, rebuild_threshold=4096):
+        self.lo, self.hi = domain
+        self.points_per_cell = points_per_cell
+        self._set_bins(16)
+        self.rebuild_threshold = rebuild_threshold
+        self.centroids = np.array([center for _, center in ORIENTATIONS.values()])
+        self.last_id = 0
+        self.last_refresh = 0.0
+        self._lock = threading.Lock()
+        # 已建索引的參照點 (依方格排序) 與各方格起點
+        self._xy = np.empty((0, 2))
+        self._labels = np.empty(0, dtype=np.int8)
+        self._cell_start = np.zeros(self.bins * self.bins + 1, dtype=np.intp)
+        # 尚未合併的新參照點
+        self._pending_xy = []
+        self._pending_labels = []
+
+    def __len__(self):
+        return len(self._labels) + len(self._pending_labels)
+
+    # --- 建立 / 更新 ---
+    def _set_bins(self, bins):
+        self.bins = bins
+        self.cell = (self.hi - self.lo) / bins
+
+    def _cells(self, xy):
+        ij = np.clip(((xy - self.lo) // self.cell).astype(np.intp), 0, self.bins - 1)
+        return ij[:, 0] * self.bins + ij[:, 1]
+
+    def _rebuild(self):
+        xy = np.concatenate([self._xy, np.asarray(self._pending_xy, dtype=np.float64).reshape(-1, 2)])
+        labels = np.concatenate([self._labels, np.asarray(self._pending_labels, dtype=np.int8)])
+        # 平均每格約 points_per_cell 個點 (參照點集中在中央時，中央方格會更密)
+        self._set_bins(int(np.clip(np.sqrt(len(labels) / self.points_per_cell), 16, 1024)))
+        cells = self._cells(xy)
+        order = np.argsort(cells, kind="stable")
+        self._xy = xy[order]
+        self._labels = labels[order]
+        self._cell_start = np.searchsorted(cells[order], np.arange(self.bins * self.bins + 1))
+        self._pending_xy = []
+        self._pending_labels = []
+
+    def add(self, xs, ys, orientations):
+        """加入已標記的參照點；orientations 為 ORIENTATIONS 的代號，未知代號會被略過。"""
+        with self._lock:
+            for x, y, key in zip(xs, ys, orientations):
+                code = _LABEL_CODE.get(key)
+                if code is not None:
+                    self._pending_xy.append((x, y))
+                    self._pending_labels.append(code)
+            if len(self._pending_labels) >= self.rebuild_threshold:
+                self._rebuild()
+
+    def refresh(self, response_store, min_interval=5.0):
+        """從資料庫讀取新增的參照點；距上次更新不足 min_interval 秒時略過。"""
+        now = time.monotonic()
+        if now - self.last_refresh < min_interval:
+            return 0
+        self.last_refresh = now
+        rows = response_store.reader().execute(
+            "SELECT id, x, y, orientation FROM reference_profiles WHERE id > ? ORDER BY id", (self.last_id,)
+        ).fetchall()
+        if rows:
+            ids, xs, ys, keys = zip(*rows)
+            self.add(xs, ys, keys)
+            self.last_id = ids[-1]
+        return len(rows)
+
+    # --- 查詢 ---
+    def _nearest(self, q, k):
+        """回傳已建索引中最近的 k 個參照點 (距離, 標籤)。"""
+        n = len(self._labels)
+        if n == 0:
+            return np.empty(0), np.empty(0, dtype=np.int8)
+        k = min(k, n)
+        ci, cj = np.clip(((q - self.lo) // self.cell).astype(np.intp), 0, self.bins - 1)
+        r = 0
+        while True:
+            i0, i1 = max(ci - r, 0), min(ci + r, self.bins - 1)
+            j0, j1 = max(cj - r, 0), min(cj + r, self.bins - 1)
+            starts = self._cell_start[np.arange(i0, i1 + 1) * self.bins + j0]
+            ends = self._cell_start[np.arange(i0, i1 + 1) * self.bins + j1 + 1]
+            idx = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+            covers_all = i0 == 0 and j0 == 0 and i1 == self.bins - 1 and j1 == self.bins - 1
+            if len(idx) >= k or covers_all:
+                d = np.hypot(*(self._xy[idx] - q).T)
+                part = np.argpartition(d, k - 1)[:k] if len(d) > k else np.arange(len(d))
+                if covers_all or d[part].max() <= self._outside_bound(q, i0, i1, j0, j1):
+                    return d[part], self._labels[idx[part]]
+            # 附近方格都是空的時 (查詢點位於稀疏區域) 加倍擴大，避免逐圈重算
+            r = r + 1 if len(idx) else 2 * r + 1
+
+    def _outside_bound(self, q, i0, i1, j0, j1):
+        """已檢查方格範圍之外的點與查詢點的最短可能距離。
+
+        範圍碰到整體邊界的那一側沒有「外面」(超出範圍的點已被歸入邊界方格)。
+        """
+        bounds = [np.inf]
+        if i0 > 0:
+            bounds.append(q[0] - (self.lo + i0 * self.cell))
+        if i1 < self.bins - 1:
+            bounds.append(self.lo + (i1 + 1) * self.cell - q[0])
+        if j0 > 0:
+            bounds.append(q[1] - (self.lo + j0 * self.cell))
+        if j1 < self.bins - 1:
+            bounds.append(self.lo + (j1 + 1) * self.cell - q[1])
+        return min(bounds)
+
+    def query(self, x, y, k=3, n_neighbors=32):
+        """回傳最接近的 k 個取向：[{key, label, distance, confidence}]，依信心排序。
+
+        distance 為與該取向最近參照 (中心點或參照受測者) 的距離；
+        confidence 為該取向在中心點與 n_neighbors 個最近參照受測者中的
+        高斯核加權佔比，六個取向合計為 1。
+        """
+        q = np.array([x, y], dtype=np.float64)
+        with self._lock:
+            dist, labels = self._nearest(q, n_neighbors)
+            if self._pending_labels:
+                pd_ = np.hypot(*(np.asarray(self._pending_xy) - q).T)
+                dist = np.concatenate([dist, pd_])
+                labels = np.concatenate([labels, np.asarray(self._pending_labels, dtype=np.int8)])
+        if len(dist) > n_neighbors:
+            keep = np.argpartition(dist, n_neighbors - 1)[:n_neighbors]
+            dist, labels = dist[keep], labels[keep]
+
+        n = len(ORIENTATIONS)
+        centroid_dist = np.hypot(*(self.centroids - q).T)
+        kernel = lambda d: np.exp(-0.5 * (d / BANDWIDTH) ** 2)
+        score = CENTROID_WEIGHT * kernel(centroid_dist) + np.bincount(labels, weights=kernel(dist), minlength=n)
+        nearest = centroid_dist.copy()
+        np.minimum.at(nearest, labels, dist)
+        total = score.sum()
+        if total > 0:
+            confidence = score / total
+        else:
+            # 距離所有參照都很遠時，退回以距離倒數分配
+            confidence = (1 / nearest) / (1 / nearest).sum()
+        top = np.argsort(-confidence, kind="stable")[:k]
+        return [
+            {
+                "key": ORIENTATION_KEYS[i],
+                "label": ORIENTATIONS[ORIENTATION_KEYS[i]][0],
+                "distance": float(nearest[i]),
+                "confidence": float(confidence[i]),
+            }
+            for i in top
+        ]
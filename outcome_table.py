@@ -0,0 +1,174 @@
+"""完整作答空間的預先計算結果表。
+
+每一種完整作答組合 (每個作答位置各選一個選項) 以混合進位制編成索引，
+對應一筆 9 bytes 的紀錄：X、Y (乘上 coord_scale 後的整數)、total_variance
+與旗標位元 (is_inconsistent、is_random、象限、無效組合)。檔案格式：
+
+    b"CTOSOUT3" | uint32 標頭長度 | JSON 標頭 | 補齊至 64 bytes | 紀錄陣列
+
+查詢時以 np.memmap 開啟，不需整檔載入記憶體。排序題名次重複的組合
+網頁表單不會產生，為了維持連續的索引空間仍保留在表中，但標記為無效，
+不計入分佈統計。
+"""
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from scoring import MISSING, ScoringMatrix
+
+DEFAULT_TABLE_PATH = Path(__file__).with_name("data") / "outcomes.bin"
+MAGIC = b"CTOSOUT3"
+RECORD_DTYPE = np.dtype([("x", "<i2"), ("y", "<i2"), ("total_variance", "<f4"), ("flags", "u1")])
+
+FLAG_INCONSISTENT = 0b001
+FLAG_RANDOM = 0b010
+QUADRANT_SHIFT = 2
+QUADRANT_MASK = 0b111
+FLAG_INVALID = 0b100000
+
+
+class OutcomeTableError(ValueError):
+    """結果表不存在、格式錯誤或與題庫版本不符。"""
+
+
+def _strides(radices):
+    strides = np.ones(len(radices), dtype=np.int64)
+    for i in range(len(radices) - 2, -1, -1):
+        strides[i] = strides[i + 1] * radices[i + 1]
+    return strides
+
+
+def _coord_scale(matrix):
+    # 找出能讓所有選項權重變為整數的最小倍率 (目前權重皆為 0.25 的倍數)
+    for scale in (1, 2, 4, 8, 16, 100):
+        scaled = matrix.weights * scale
+        if np.allclose(scaled, np.round(scaled)):
+            return scale
+    raise OutcomeTableError("選項權重無法以整數座標儲存")
+
+
+def decode(indices, radices):
+    """索引 -> (n, 作答位置數) 代碼矩陣。"""
+    indices = np.asarray(indices, dtype=np.int64)
+    strides = _strides(radices)
+    return ((indices[:, None] // strides) % np.asarray(radices)).astype(np.int16)
+
+
+def build(bank, path=DEFAULT_TABLE_PATH, chunk_size=1 << 18):
+    """列舉所有作答組合並寫入結果表，回傳統計摘要。"""
+    matrix = ScoringMatrix(bank)
+    radices = [int(s) for s in matrix.sizes]
+    total = int(np.prod(radices, dtype=np.int64))
+    scale = _coord_scale(matrix)
+    records = np.empty(total, dtype=RECORD_DTYPE)
+
+    for start in range(0, total, chunk_size):
+        idx = np.arange(start, min(start + chunk_size, total), dtype=np.int64)
+        codes = decode(idx, radices)
+        res = matrix.score(codes)
+        # 排序題名次重複時 validate_ranks 會把該題標為缺答
+        invalid = (matrix.validate_ranks(codes) == MISSING).any(axis=1)
+        chunk = records[start:start + len(idx)]
+        chunk["x"] = np.round(res["X"] * scale)
+        chunk["y"] = np.round(res["Y"] * scale)
+        chunk["total_variance"] = res["total_variance"]
+        chunk["flags"] = (res["is_inconsistent"] * FLAG_INCONSISTENT
+                          | res["is_random"] * FLAG_RANDOM
+                          | res["quadrant"].astype(np.uint8) << QUADRANT_SHIFT
+                          | invalid * FLAG_INVALID)
+
+    header = {
+        "bank_version": bank.version,
+        "slots": [list(s) for s in matrix.slots],
+        "radices": radices,
+        "count": total,
+        "coord_scale": scale,
+        "stats": summarize(records, scale),
+    }
+    raw = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(raw)) + raw
+    prefix += b"\0" * (-len(prefix) % 64)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(prefix)
+        records.tofile(f)
+    return header["stats"]
+
+
+def summarize(records, scale):
+    """有效作答組合的分佈統計：象限可及性、旗標觸發比例與座標範圍。"""
+    valid = (records["flags"] & FLAG_INVALID) == 0
+    invalid_count = len(records) - int(np.count_nonzero(valid))
+    records = records[valid]
+    n = len(records)
+    quadrant = (records["flags"] >> QUADRANT_SHIFT) & QUADRANT_MASK
+    counts = np.bincount(quadrant, minlength=5)
+    x = records["x"] / scale
+    y = records["y"] / scale
+    return {
+        "combinations": n,
+        "invalid_combinations": invalid_count,
+        "quadrant_counts": {str(q): int(c) for q, c in enumerate(counts)},
+        "quadrant_share": {str(q): float(c / n) for q, c in enumerate(counts)},
+        "reachable_quadrants": [q for q in range(1, 5) if counts[q] > 0],
+        "inconsistent_rate": float(np.count_nonzero(records["flags"] & FLAG_INCONSISTENT) / n),
+        "random_rate": float(np.count_nonzero(records["flags"] & FLAG_RANDOM) / n),
+        "x_range": [float(x.min()), float(x.max())],
+        "y_range": [float(y.min()), float(y.max())],
+        "total_variance_quantiles": {
+            str(q): float(v) for q, v in zip((0.5, 0.9, 0.99),
+                                             np.quantile(records["total_variance"], (0.5, 0.9, 0.99)))
+        },
+    }
+
+
+class OutcomeTable:
+    """唯讀的結果表 (memmap)。"""
+
+    def __init__(self, path=DEFAULT_TABLE_PATH):
+        path = Path(path)
+        if not path.exists():
+            raise OutcomeTableError(f"找不到結果表 {path}，請先執行 enumerate_outcomes.py")
+        with open(path, "rb") as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                if magic[:-1] == MAGIC[:-1]:
+                    raise OutcomeTableError(f"{path} 的格式較舊，請重新執行 enumerate_outcomes.py")
+                raise OutcomeTableError(f"{path} 不是結果表檔案")
+            (length,) = struct.unpack("<I", f.read(4))
+            self.header = json.loads(f.read(length).decode("utf-8"))
+        offset = len(MAGIC) + 4 + length
+        offset += -offset % 64
+        self.slots = [tuple(s) for s in self.header["slots"]]
+        self.radices = self.header["radices"]
+        self.scale = self.header["coord_scale"]
+        self.stats = self.header["stats"]
+        self._strides = [int(s) for s in _strides(self.radices)]
+        self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=offset, shape=(self.header["count"],))
+
+    @property
+    def bank_version(self):
+        return self.header["bank_version"]
+
+    def index(self, codes):
+        return sum(int(c) * s for c, s in zip(codes, self._strides))
+
+    def lookup(self, codes):
+        """依各作答位置的代碼 (順序同 self.slots) 查詢結果；valid 為 False 表示排序題名次重複。"""
+        if len(codes) != len(self.slots) or any(not 0 <= c < r for c, r in zip(codes, self.radices)):
+            raise OutcomeTableError(f"作答代碼不完整或超出範圍：{codes!r}")
+        rec = self.records[self.index(codes)]
+        flags = int(rec["flags"])
+        return {
+            "X": int(rec["x"]) / self.scale,
+            "Y": int(rec["y"]) / self.scale,
+            "total_variance": float(rec["total_variance"]),
+            "is_inconsistent": bool(flags & FLAG_INCONSISTENT),
+            "is_random": bool(flags & FLAG_RANDOM),
+            "quadrant": (flags >> QUADRANT_SHIFT) & QUADRANT_MASK,
+            "valid": not flags & FLAG_INVALID,
+        }
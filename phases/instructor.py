@@ -0,0 +1,118 @@
+# ==========================================
+# 教師儀表板：班級即時統計
+# ==========================================
+import io
+import os
+
+import streamlit as st
+import pandas as pd
+
+from class_stats import ClassAggregate
+from common import BANK, STORE
+from ledger import INCONSISTENT_VARIANCE, QUADRANT_LABELS, RANDOM_VARIANCE
+from psychometrics import ItemStatistics
+from report import FORMATS, export_zip, fonts_available, latest_results
+
+# 班級統計每個行程一份，定時增量更新
+@st.cache_resource
+def get_class_aggregate():
+    return ClassAggregate(BANK.version)
+
+# 全體受測者的題目統計 (充分統計量增量維護，按需計算)
+@st.cache_resource
+def get_item_statistics():
+    return ItemStatistics(BANK)
+
+st.title("👩‍🏫 教師儀表板")
+
+if st.session_state.get('instructor_ok') is not True:
+    key = st.text_input("請輸入教師密碼：", type="password")
+    if key and key == os.environ.get("CTOS_INSTRUCTOR_KEY"):
+        st.session_state.instructor_ok = True
+        st.rerun()
+    elif key:
+        st.error("密碼錯誤。")
+    st.stop()
+
+aggregate = get_class_aggregate()
+if st.button("🔄 重設統計 (開始新的一堂課)"):
+    aggregate.reset(STORE)
+
+# Phase 2 情境題與 Phase 3 陰影排序的選項分佈
+ITEM_SLOTS = [("P2-Q1", 0), ("P2-Q2", 0), ("P2-Q3", 0), ("P3-Q1", 1), ("P3-Q1", 2)]
+
+def option_frequency(counts, qid, rank):
+    ids = BANK.option_ids(qid)
+    return pd.DataFrame(
+        {"人數": [counts.get(code, 0) for code in range(len(ids))]},
+        index=[BANK.score(qid, oid, rank).label for oid in ids],
+    )
+
+@st.fragment(run_every="5s")
+def live_dashboard():
+    aggregate.refresh(STORE)
+    snap = aggregate.snapshot()
+    st.caption(f"資料版本 v{snap['version']}（每 5 秒更新）")
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("作答學生數", snap["n_students"])
+    c2.metric("完成報告數", snap["n_results"])
+    c3.metric("整合性提示比例", f"{snap['inconsistent_share']:.0%}")
+    c4.metric("隨機作答警示比例", f"{snap['random_share']:.0%}")
+
+    if snap["n_results"]:
+        st.markdown(f"**班級平均位置**：X = {snap['mean_x']:.2f}，Y = {snap['mean_y']:.2f}")
+        st.subheader("象限分佈")
+        st.bar_chart(pd.DataFrame(
+            {"人數": snap["quadrant_counts"]},
+            index=[QUADRANT_LABELS[q] for q in range(len(snap["quadrant_counts"]))],
+        ))
+
+    st.subheader("各題選項分佈")
+    cols = st.columns(len(ITEM_SLOTS))
+    for col, (qid, rank) in zip(cols, ITEM_SLOTS):
+        with col:
+            title = BANK.question(qid)["title"]
+            st.markdown(f"**{qid}{f' 第{rank}名' if rank else ''}**  \n{title}")
+            st.bar_chart(option_frequency(snap["option_counts"].get((qid, rank), {}), qid, rank))
+
+live_dashboard()
+
+# --- 量表品質 (全體受測者，按需計算) ---
+st.markdown("---")
+st.subheader("量表品質分析")
+if st.button("📐 計算題目統計與信度"):
+    item_stats = get_item_statistics()
+    item_stats.refresh(STORE)
+    report = item_stats.report()
+    if report["n"] < 2:
+        st.info("完整作答的受測者不足，無法計算。")
+    else:
+        thresholds = report["thresholds"]
+        c1, c2, c3 = st.columns(3)
+        c1.metric("完整作答人數", f"{report['n']:,}")
+        c2.metric("Cronbach's α (X 軸)", f"{report['alpha_x']:.2f}" if report["alpha_x"] is not None else "—")
+        c3.metric("Cronbach's α (Y 軸)", f"{report['alpha_y']:.2f}" if report["alpha_y"] is not None else "—")
+        st.dataframe(pd.DataFrame(report["items"]).set_index("item"), use_container_width=True)
+        st.markdown(
+            f"**建議門檻**：整合性提示 {thresholds['inconsistent_variance']}（目前 {INCONSISTENT_VARIANCE}），"
+            f"隨機作答 {thresholds['random_variance']}（目前 {RANDOM_VARIANCE}）"
+        )
+
+# --- 全班報告匯出 (本堂課開始後完成報告的學生) ---
+st.markdown("---")
+st.subheader("匯出全班報告")
+export_format = st.radio("格式", FORMATS, horizontal=True, format_func=str.upper)
+
+def class_report_zip():
+    results = latest_results(STORE, BANK.version, since_id=aggregate.start_result_id)
+    buf = io.BytesIO()
+    export_zip(BANK, results, buf, fmt=export_format)
+    return buf.getvalue()
+
+if fonts_available():
+    st.download_button("📦 下載全班報告 (zip)", data=class_report_zip,
+                       file_name=f"ctos_reports_{export_format}.zip", mime="application/zip")
+else:
+    st.warning("伺服器未安裝中文字型，無法產生報告：請安裝 Noto Sans CJK、放到 assets/fonts/，"
+               "或以 CTOS_REPORT_FONT 指定字型檔。")
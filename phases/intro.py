@@ -0,0 +1,37 @@
+# ==========================================
+# 前言：恢復詳細版
+# ==========================================
+import streamlit as st
+
+st.title("諮商專業取向深度探索系統 (CTOS-Pro)")
+st.markdown("### 系統建置邏輯與理論基礎")
+
+st.markdown("""
+本系統專為諮商心理學相關背景之學生與實務工作者設計，旨在透過多維度的自我評估，探索個人的**諮商理論取向 (Counseling Theoretical Orientation)**。
+
+#### 1. 理論架構 (Theoretical Framework)
+本測驗主要依據 **Poznanski & McLennan (1995)** 所提出的 **Counselor Theoretical Position Scale (CTPS)** 以及 **Worthington & Dillon (2011)** 的 **TOPS-R** 量表進行架構設計。系統將諮商取向解構為兩個核心的連續變項 (Continuum)：
+
+* **X 軸：知識論立場 (Epistemological Stance)**
+    * **客觀實證 (Objective/Empirical)**：傾向相信真理的外在性、可觀察性，重視結構、測量與科學證據。
+    * **主觀建構 (Subjective/Constructivist)**：傾向相信真理的內在性、個別性，重視現象學、個人意義與獨特經驗。
+
+* **Y 軸：介入焦點 (Intervention Focus)**
+    * **理性分析 (Rational/Analytical)**：傾向透過認知重構、邏輯分析、洞察 (Insight) 潛意識結構來促成改變。
+    * **情感體驗 (Experiential/Affective)**：傾向透過情感宣洩、此時此刻的覺察、矯正性情緒經驗來促成改變。
+
+#### 2. 評估方法論 (Methodology)
+本系統採用 **三角檢證法 (Triangulation)** 設計題型，以提升效度：
+* **隱喻投射 (Phase 1)**：測量潛意識中的治療師角色認同。
+* **情境模擬 (Phase 2)**：測量臨床現場的直覺反應與介入偏好。
+* **反向指標 (Phase 3)**：透過「陰影 (Shadow)」與恐懼，推論個人的核心價值（例如：恐懼失控可能反映對結構的需求）。
+* **環境心理 (Phase 4)**：透過空間配置偏好，測量對治療框架與界線的看法。
+
+#### 3. 聲明與限制 (Limitations)
+* **動態性**：諮商取向是一個動態發展的過程，本結果僅代表您「當下」的傾向，並非永久的標籤。
+* **建議性質**：分析結果僅供自我覺察與督導討論之參考，不應作為評斷專業能力之依據。
+
+---
+#### ⚠️ 作答說明
+本系統包含不同形式的題目（選擇、排序、情境）。**請注意：每一題作答完畢後，皆須點擊該題下方的「確認按鈕」，系統才會進行計分。**
+""")
@@ -0,0 +1,72 @@
+# ==========================================
+# Phase 1: 隱喻投射 (圖片更新)
+# ==========================================
+import streamlit as st
+
+from common import ASSETS, BANK, option_radio, record_answer
+from metrics import timed
+
+st.header("Phase 1: 治療關係中的角色隱喻")
+
+# --- Q1: 登山隱喻 ---
+st.markdown(f"#### {BANK.question('P1-Q1')['title']}")
+
+# A. 嚮導 / B. 伴侶 / C. 觀察者 / D. 教練 (本地縮圖，見 build_assets.py)
+role_ids = BANK.option_ids("P1-Q1")
+with timed("phase1.role_images"):
+    for row in range(0, len(role_ids), 2):
+        for col, oid in zip(st.columns(2), role_ids[row:row + 2]):
+            with col:
+                st.image(ASSETS["role_images"][oid], caption=oid)
+
+@st.fragment
+def question_q1():
+    choice1 = option_radio("P1-Q1")
+    
+    if st.button("確認 Q1"):
+        record_answer("P1-Q1", choice1)
+        st.success("數據已記錄。")
+
+question_q1()
+
+st.markdown("---")
+
+# --- Q2: 魔法工具 (卡片式說明 + 單選) ---
+st.markdown(f"#### {BANK.question('P1-Q2')['title']}")
+st.markdown("請選擇您在治療中最習慣使用的「介入方向」。")
+
+# 顯示卡片說明 (僅作展示)
+st.markdown(ASSETS["tool_cards"], unsafe_allow_html=True)
+
+# 單選題
+@st.fragment
+def question_q2():
+    tool_choice = option_radio("P1-Q2")
+
+    if st.button("確認 Q2"):
+        record_answer("P1-Q2", tool_choice)
+        st.success("已記錄數據。")
+
+question_q2()
+
+st.markdown("---")
+
+# --- Q3: 校準題 ---
+q3 = BANK.question("P1-Q3")
+st.markdown(f"#### {q3['title']}")
+st.markdown(f"""
+<div style="font-size: 18px; padding: 15px; border: 1px solid #ddd; background-color:#fafafa; border-radius: 5px;">
+<b>題目說明：</b>此題用於校準您的基本知識論立場。請評估您對以下敘述的認同程度：<br><br>
+<b>「{q3['statement']}」</b>
+</div>
+""", unsafe_allow_html=True)
+
+@st.fragment
+def question_q3():
+    q3_score = st.slider(q3["prompt"], q3["min"], q3["max"], q3["default"])
+    
+    if st.button("確認 Q3 校準"):
+        record_answer("P1-Q3", q3_score)
+        st.success("校準數據已記錄。")
+
+question_q3()
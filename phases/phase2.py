@@ -0,0 +1,26 @@
+# ==========================================
+# Phase 2: 臨床決策 (純淨版)
+# ==========================================
+import streamlit as st
+
+from common import BANK, option_radio, record_answer
+
+st.header("Phase 2: 改變機制的觀點")
+
+scenario_ids = ["P2-Q1", "P2-Q2", "P2-Q3"]
+
+# 三個情境共用一個確認按鈕，因此整組包成一個 fragment
+@st.fragment
+def scenario_group():
+    answers = {}
+    for qid in scenario_ids:
+        q = BANK.question(qid)
+        st.markdown(f'<div class="scenario-box"><b>{q["title"]}</b><br>{q["scenario"]}</div>', unsafe_allow_html=True)
+        answers[qid] = option_radio(qid, key=f"s2_{qid[-2:].lower()}")
+    
+    if st.button("確認 Phase 2 所有回答"):
+        for qid in scenario_ids:
+            record_answer(qid, answers[qid])
+        st.success("數據已記錄。")
+
+scenario_group()
@@ -0,0 +1,48 @@
+# ==========================================
+# Phase 3: 陰影探索
+# ==========================================
+import streamlit as st
+
+from common import BANK, option_radio, record_answer
+
+st.header("Phase 3: 陰影與反移情")
+st.markdown("本階段透過「反向指標」，測量您對於特定治療情境的潛在焦慮。")
+
+# --- Q1 ---
+shadow_q = BANK.question("P3-Q1")
+st.subheader(shadow_q["title"])
+st.write(shadow_q["description"])
+
+shadow_choices = [None] + BANK.option_ids("P3-Q1")
+shadow_label = lambda oid: shadow_q["placeholder"] if oid is None else BANK.option_text("P3-Q1", oid)
+shadow_keys = [f"p3_shadow_{rank}" for rank in range(1, len(shadow_q["ranks"]) + 1)]
+
+@st.fragment
+def shadow_selectors():
+    for r, key in zip(shadow_q["ranks"], shadow_keys):
+        st.selectbox(r["prompt"], shadow_choices, format_func=shadow_label, key=key)
+
+shadow_selectors()
+
+# --- Q2 ---
+st.subheader(BANK.question("P3-Q2")["title"])
+
+@st.fragment
+def process_fear_question():
+    option_radio("P3-Q2", key="p3_process_fear")
+
+process_fear_question()
+
+# 確認按鈕從 session state 讀取上方兩個 fragment 的作答
+@st.fragment
+def confirm_phase3():
+    if st.button("確認 Phase 3 所有回答"):
+        shadows = [st.session_state[key] for key in shadow_keys]
+        if None not in shadows and len(set(shadows)) == len(shadows):
+            for rank, oid in enumerate(shadows, start=1):
+                record_answer("P3-Q1", oid, rank)
+    
+        record_answer("P3-Q2", st.session_state.p3_process_fear)
+        st.success("數據已記錄。")
+
+confirm_phase3()
@@ -0,0 +1,63 @@
+# ==========================================
+# Phase 4: 空間配置 (私密情境 + 描述回歸)
+# ==========================================
+import functools
+
+import streamlit as st
+
+from common import BANK, option_radio, record_answer
+from metrics import timed
+
+st.header("Phase 4: 空間心理與人際界線")
+st.markdown("""
+<div class="warning-box">
+<b>🔥 情境轉換：私人領域的深度對話</b><br>
+請暫時放下「諮商室標準配置」的考量。想像您邀請一位非常信任的摯友到家中，準備進行一場深入靈魂的徹夜長談。<br>
+為了讓<b>「您自己」</b>感到最自在、最能真誠交流，您身體直覺會選擇哪一種坐法？
+</div>
+""", unsafe_allow_html=True)
+
+@functools.lru_cache(maxsize=None)
+def get_layout_svg(layout_type):
+    base_svg = '<svg width="250" height="180" xmlns="http://www.w3.org/2000/svg" style="background-color:#ffffff; border:1px solid #eee;">'
+    if layout_type == "SideBySide":
+        # 兩圓並排
+        content = """<rect x="50" y="80" width="150" height="50" rx="10" fill="#f1c40f" opacity="0.3"/><circle cx="100" cy="105" r="20" fill="#3498db" /> <text x="90" y="110" fill="white" font-size="10">You</text><circle cx="150" cy="105" r="20" fill="#e74c3c" /> <text x="140" y="110" fill="white" font-size="10">Friend</text><text x="75" y="160" fill="#666" font-size="12">並肩而坐 (沙發)</text>"""
+    elif layout_type == "L_Shape":
+        content = """<rect x="120" y="90" width="40" height="40" fill="#ecf0f1" stroke="#bdc3c7"/><circle cx="90" cy="70" r="20" fill="#3498db" /> <text x="80" y="75" fill="white" font-size="10">You</text><circle cx="160" cy="140" r="20" fill="#e74c3c" /> <text x="150" y="145" fill="white" font-size="10">Friend</text><text x="150" y="40" fill="#666" font-size="12">舒適斜角 (L型)</text>"""
+    elif layout_type == "Formal":
+        content = """<rect x="105" y="40" width="40" height="100" fill="#ecf0f1" stroke="#bdc3c7"/><circle cx="60" cy="90" r="20" fill="#3498db" /> <text x="50" y="95" fill="white" font-size="10">You</text><circle cx="190" cy="90" r="20" fill="#e74c3c" /> <text x="180" y="95" fill="white" font-size="10">Friend</text><text x="90" y="25" fill="#666" font-size="12">面對面 (隔著桌子)</text>"""
+    elif layout_type == "Separate":
+        # 獨立座椅 (無躺椅)
+        content = """<circle cx="50" cy="90" r="20" fill="#3498db" /> <text x="40" y="95" fill="white" font-size="10">You</text><circle cx="200" cy="90" r="20" fill="#e74c3c" /> <text x="190" y="95" fill="white" font-size="10">Friend</text><path d="M 80 90 L 170 90" stroke="#999" stroke-width="1" stroke-dasharray="4"/><text x="85" y="150" fill="#666" font-size="12">獨立座椅 (保持距離)</text>"""
+    return base_svg + content + '</svg>'
+
+@st.fragment
+@timed("phase4.layout_buttons")
+def layout_buttons():
+    layout_ids = BANK.option_ids("P4-Q1")
+    layout_cols = st.columns(2)
+    per_col = -(-len(layout_ids) // len(layout_cols))
+    for i, oid in enumerate(layout_ids):
+        opt = BANK.option("P4-Q1", oid)
+        with layout_cols[i // per_col]:
+            st.markdown(get_layout_svg(opt["layout"]), unsafe_allow_html=True)
+            if st.button(opt["text"]):
+                record_answer("P4-Q1", oid)
+                st.success("已選擇")
+
+layout_buttons()
+
+st.markdown("---")
+visual_q = BANK.question("P4-Q2")
+st.subheader(visual_q["title"])
+st.write(visual_q["description"])
+
+@st.fragment
+def visual_question():
+    use_visual = option_radio("P4-Q2")
+    if st.button("確認 Q2"):
+        record_answer("P4-Q2", use_visual)
+        st.success("數據已記錄。")
+
+visual_question()
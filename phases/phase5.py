@@ -0,0 +1,154 @@
+# ==========================================
+# Phase 5: 綜合分析報告 (修復當機)
+# ==========================================
+import streamlit as st
+import pandas as pd
+
+from bootstrap import ledger_region, stability_verdict
+from cohort import CohortGrid
+from common import BANK, STORE, record_result
+from ledger import QUADRANT_LABELS, quadrant_of
+from metrics import timed
+from orientation import OrientationIndex
+from outcome_table import OutcomeTable, OutcomeTableError
+from report import fonts_available, get_report
+from theory_map import render_spec
+
+# --- 預先計算的結果表 (見 enumerate_outcomes.py；不存在或版本不符時改用帳本計算) ---
+@st.cache_resource
+def get_outcome_table():
+    try:
+        table = OutcomeTable()
+    except OutcomeTableError:
+        return None
+    return table if table.bank_version == BANK.version else None
+
+# --- 全體受測者密度格網 (每個行程一份，增量更新) ---
+@st.cache_resource
+def get_cohort_grid():
+    return CohortGrid()
+
+# --- 最近取向分類器 (每個行程建立一次，參照資料增量加入) ---
+@st.cache_resource
+def get_orientation_index():
+    return OrientationIndex()
+
+st.title("📊 諮商專業取向分析報告")
+
+# 檢查是否有數據 (防呆機制)
+ledger = st.session_state.ledger
+if len(ledger) == 0:
+    st.error("⚠️ 尚未偵測到作答數據。請回到各階段完成題目並點擊「確認按鈕」。")
+    st.stop()
+
+x = ledger.x
+y = ledger.y
+
+# --- 1. 亂答檢測與定位穩定度 ---
+st.markdown("---")
+st.subheader("1. 資料品質檢測 (Consistency Check)")
+
+outcome_table = get_outcome_table()
+outcome = None
+if outcome_table is not None:
+    codes = [ledger.code(qid, rank) for qid, rank in outcome_table.slots]
+    if None not in codes:
+        outcome = outcome_table.lookup(codes)
+        if not outcome["valid"]:
+            outcome = None
+
+if outcome is not None:
+    is_random = outcome["is_random"]
+else:
+    _, is_random = ledger.flags()
+record_result(ledger)
+
+# 重抽題目貢獻估計位置的穩定度 (一次向量化運算，數毫秒)
+with timed("phase5.bootstrap"):
+    region = ledger_region(ledger)
+quadrant_prob = region["quadrant_prob"]
+
+if is_random:
+    st.error("⚠️ **作答有效性警示**：系統偵測到您的作答模式存在高度隨機性。")
+    st.markdown("您的選項在不同階段互相高度牴觸，導致結果相互抵消。建議您重新靜心施測。")
+else:
+    stable, title, detail = stability_verdict(quadrant_prob, len(ledger))
+    if stable:
+        st.success(f"✅ **{title}**：{detail}")
+    else:
+        st.info(f"ℹ️ **{title}**：{detail}")
+
+st.markdown("**各取向的可能性 (Bootstrap)**")
+st.bar_chart(pd.DataFrame(
+    {"機率": [quadrant_prob[q] for q in QUADRANT_LABELS]},
+    index=[QUADRANT_LABELS[q] for q in QUADRANT_LABELS],
+))
+
+# --- 2. 理論地圖 ---
+st.header("2. 理論地圖定位")
+
+# 背景圖層與編碼每個行程只建立一次 (theory_map.base_spec)，這裡只替換具名資料集
+cohort_cells = None
+if st.checkbox("疊加全體受測者分佈 (Cohort)", value=True):
+    cohort_grid = get_cohort_grid()
+    cohort_grid.refresh(STORE)
+    if cohort_grid.total:
+        # 只傳送非零方格，資料量與受測人數無關
+        cohort_cells = pd.DataFrame(cohort_grid.cells())
+        st.caption(f"淺藍色方格為 {cohort_grid.total:,} 位受測者的分佈密度。")
+
+with timed("phase5.theory_map"):
+    st.vega_lite_chart(render_spec(x, y, cohort_cells, region["ellipse"]), use_container_width=True)
+st.caption("紅色虛線為 95% 信賴橢圓：重抽作答後您的位置可能落在的範圍。")
+
+if outcome_table is not None:
+    space = outcome_table.stats
+    quadrant = quadrant_of(x, y)
+    st.caption(f"在全部 {space['combinations']:,} 種有效的完整作答組合中，"
+               f"{space['quadrant_share'][str(quadrant)]:.1%} 落在「{QUADRANT_LABELS[quadrant]}」，"
+               f"{space['random_rate']:.1%} 會觸發隨機作答警示。")
+
+# --- 3. 六大取向參照 ---
+st.header("3. 六大諮商取向參照")
+
+orientation_index = get_orientation_index()
+with timed("phase5.orientation"):
+    orientation_index.refresh(STORE)
+    nearest = orientation_index.query(x, y, k=3)
+st.markdown("**與您最接近的取向**")
+for col, match in zip(st.columns(len(nearest)), nearest):
+    col.metric(match["label"], f"{match['confidence']:.0%}", f"距離 {match['distance']:.1f}", delta_color="off")
+if len(orientation_index):
+    st.caption(f"依六大取向中心點與 {len(orientation_index):,} 位已標記取向的參照受測者計算。")
+
+st.markdown("""
+各取向的說明如下：
+
+* **↗️ 第一象限 (認知行為 CBT/REBT)**：相信問題源於錯誤認知，需透過理性證據與行為練習來修正。
+* **↖️ 第二象限 (心理動力 Psychodynamic)**：相信問題源於潛意識衝突，需透過理性洞察與移情分析來修通。
+* **↙️ 第三象限 (人本/體驗/完形)**：相信關係與覺察即治療，重視此時此刻的情感接觸與真誠一致。
+* **↘️ 第四象限 (系統/策略/現實)**：重視互動模式與具體行動計畫，較少探索深層情感，強調問題解決。
+* **⬅️ 左側中軸 (後現代/敘事)**：介於分析與體驗之間，強調語言建構、故事重寫與去病理化。
+* **⬇️ 下方中軸 (表達性藝術)**：介於主客觀之間，強調非語言的創作歷程與身心體驗。
+""")
+
+# --- 4. 脈絡化分析 ---
+st.header("4. 個人化脈絡分析")
+st.write("以下是系統根據您各階段選擇所生成的整合分析：")
+
+for qid, rank, code, _, _ in ledger.entries():
+    item = BANK.score(qid, BANK.option_id(qid, code), rank)
+    st.markdown(f"**【{qid}】** {item.label}")
+    st.caption(f"💡 分析：{item.reasoning}")
+
+# --- 5. 下載報告 (點擊時才繪製；相同作答組合共用快取) ---
+st.header("5. 下載報告")
+if fonts_available():
+    answer_key = ledger.answer_key()
+    c1, c2 = st.columns(2)
+    c1.download_button("⬇️ 下載 PNG", data=lambda: get_report(BANK, answer_key, "png"),
+                       file_name="ctos_report.png", mime="image/png")
+    c2.download_button("⬇️ 下載 PDF", data=lambda: get_report(BANK, answer_key, "pdf"),
+                       file_name="ctos_report.pdf", mime="application/pdf")
+else:
+    st.caption("伺服器未安裝中文字型，暫時無法產生報告檔 (見 README 的報告下載一節)。")
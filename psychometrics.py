@@ -0,0 +1,169 @@
+"""全體受測者的串流心理計量統計。
+
+以 results 表 (與題庫同版本、每位受測者最新一筆、作答完整者) 為資料來源，增量維護充分統計量：
+各作答位置的選項次數、X / Y 兩軸各題貢獻的總和與外積和 (可得共變異數矩陣)，
+以及 total_variance 的細格直方圖。由這些統計量即可隨時算出
+修正後的題目-總分相關、各軸 Cronbach's alpha，並依分佈重新校準一致性門檻，
+不需重新讀取整個作答表。同一受測者更新結果時，先扣除舊向量再加入新向量。
+"""
+import threading
+
+import numpy as np
+
+from ledger import RANDOM_RADIUS, parse_answer_key
+from scoring import MISSING, ScoringMatrix
+
+VARIANCE_BIN = 0.01
+BIN_DECIMALS = 2
+VARIANCE_MAX = 50.0
+
+
+def answer_codes(answer_key, matrix):
+    """ScoreLedger.answer_key() 字串 -> 各作答位置代碼 (缺答為 MISSING)。"""
+    codes = np.full(len(matrix.slots), MISSING, dtype=np.int16)
+    position = {slot: i for i, slot in enumerate(matrix.slots)}
+    for qid, rank, code in parse_answer_key(answer_key):
+        i = position.get((qid, rank))
+        if i is not None:
+            codes[i] = code
+    return codes
+
+
+class ItemStatistics:
+    def __init__(self, bank):
+        self.matrix = ScoringMatrix(bank)
+        k = len(self.matrix.slots)
+        self.k = k
+        self.n = 0
+        self.sums = np.zeros((2, k))
+        self.cross = np.zeros((2, k, k))
+        self.option_counts = np.zeros(self.matrix.n_features, dtype=np.int64)
+        n_bins = int(VARIANCE_MAX / VARIANCE_BIN) + 1
+        self.variance_hist = np.zeros(n_bins, dtype=np.int64)
+        self.center_variance_hist = np.zeros(n_bins, dtype=np.int64)
+        self.last_result_id = 0
+        self._session = {}
+        self._lock = threading.Lock()
+
+    # --- 增量更新 ---
+    def _contributions(self, codes):
+        # (2, k)：每個作答位置在 X、Y 軸上的貢獻
+        features = self.matrix.offsets + codes
+        return self.matrix.weights[features].T, features
+
+    def _apply(self, entry, sign):
+        items, features, var_bin, center = entry
+        self.n += sign
+        self.sums += sign * items
+        self.cross += sign * (items[:, :, None] * items[:, None, :])
+        np.add.at(self.option_counts, features, sign)
+        self.variance_hist[var_bin] += sign
+        if center:
+            self.center_variance_hist[var_bin] += sign
+
+    def add(self, session_id, answer_key):
+        """加入一位受測者的作答；作答不完整 (含無效的排序題) 時略過。"""
+        codes = self.matrix.validate_ranks(answer_codes(answer_key, self.matrix)[None, :])[0]
+        if (codes == MISSING).any():
+            return False
+        items, features = self._contributions(codes)
+        x, y = items.sum(axis=1)
+        total_variance = items.var(axis=1).sum()
+        var_bin = min(int(total_variance / VARIANCE_BIN), len(self.variance_hist) - 1)
+        center = abs(x) < RANDOM_RADIUS and abs(y) < RANDOM_RADIUS
+        entry = (items, features, var_bin, center)
+        with self._lock:
+            old = self._session.get(session_id)
+            if old is not None:
+                self._apply(old, -1)
+            self._apply(entry, 1)
+            self._session[session_id] = entry
+        return True
+
+    def refresh(self, response_store):
+        # answer_key 中的代碼是選項在題庫中的位置，只讀取與本題庫同版本的結果
+        rows = response_store.reader().execute(
+            "SELECT id, session_id, answer_key FROM results WHERE id > ? AND bank_version = ? ORDER BY id",
+            (self.last_result_id, self.matrix.bank.version),
+        ).fetchall()
+        for row_id, session_id, answer_key in rows:
+            self.add(session_id, answer_key)
+            self.last_result_id = row_id
+        return len(rows)
+
+    # --- 衍生統計 ---
+    def covariance(self):
+        """(2, k, k) 樣本共變異數矩陣。"""
+        with self._lock:
+            n, sums, cross = self.n, self.sums.copy(), self.cross.copy()
+        if n < 2:
+            return np.full((2, self.k, self.k), np.nan)
+        return (cross - sums[:, :, None] * sums[:, None, :] / n) / (n - 1)
+
+    def item_total_correlations(self, cov=None):
+        """(2, k) 修正後題目-總分相關 (該題與其餘題目總分的相關)。"""
+        cov = self.covariance() if cov is None else cov
+        item_var = np.diagonal(cov, axis1=1, axis2=2)
+        row_sum = cov.sum(axis=2)
+        total_var = cov.sum(axis=(1, 2))[:, None]
+        cov_rest = row_sum - item_var
+        var_rest = total_var - 2 * row_sum + item_var
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return cov_rest / np.sqrt(item_var * var_rest)
+
+    def cronbach_alpha(self, cov=None):
+        """(2,) 兩軸各自的 Cronbach's alpha。"""
+        cov = self.covariance() if cov is None else cov
+        item_var = np.trace(cov, axis1=1, axis2=2)
+        total_var = cov.sum(axis=(1, 2))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.k / (self.k - 1) * (1 - item_var / total_var)
+
+    @staticmethod
+    def _quantile(hist, q):
+        total = hist.sum()
+        if total == 0:
+            return None
+        idx = int(np.searchsorted(np.cumsum(hist), q * total))
+        # 四捨五入到細格精度，避免 4.8100000000000005 之類的浮點尾數
+        return round((idx + 1) * VARIANCE_BIN, BIN_DECIMALS)
+
+    def recalibrate(self, inconsistent_quantile=0.8, random_quantile=0.95):
+        """依目前分佈建議的一致性門檻。
+
+        inconsistent_variance：全體 total_variance 的分位數；
+        random_variance：座標落在原點附近 (|X|, |Y| < RANDOM_RADIUS) 者的分位數。
+        """
+        with self._lock:
+            return {
+                "inconsistent_variance": self._quantile(self.variance_hist, inconsistent_quantile),
+                "random_variance": self._quantile(self.center_variance_hist, random_quantile),
+                "n": self.n,
+            }
+
+    def report(self):
+        cov = self.covariance()
+        item_total = self.item_total_correlations(cov)
+        alpha = self.cronbach_alpha(cov)
+        means = self.sums / self.n if self.n else np.zeros_like(self.sums)
+        items = []
+        for i, (column, size, offset) in enumerate(zip(self.matrix.columns, self.matrix.sizes, self.matrix.offsets)):
+            items.append({
+                "item": column,
+                "option_counts": self.option_counts[offset:offset + size].tolist(),
+                "mean_dx": float(means[0, i]),
+                "mean_dy": float(means[1, i]),
+                "item_total_r_x": _float(item_total[0, i]),
+                "item_total_r_y": _float(item_total[1, i]),
+            })
+        return {
+            "n": self.n,
+            "alpha_x": _float(alpha[0]),
+            "alpha_y": _float(alpha[1]),
+            "items": items,
+            "thresholds": self.recalibrate(),
+        }
+
+
+def _float(value):
+    return None if not np.isfinite(value) else float(value)
@@ -0,0 +1,172 @@
+"""題庫載入、驗證與計分表編譯。
+
+題目、選項、權重與分析文字都存放在 question_bank.json，
+載入時一次驗證並編譯成以 (題號, 選項ID, 排序名次) 為鍵的查表，
+計分時只需 O(1) 查詢，不再依賴選項文字的子字串比對。
+"""
+import json
+from pathlib import Path
+from typing import NamedTuple
+
+QUESTION_BANK_PATH = Path(__file__).with_name("question_bank.json")
+SCHEMA_VERSION = 1
+QUESTION_TYPES = ("choice", "scale", "rank")
+
+
+class QuestionBankError(ValueError):
+    """題庫檔案格式錯誤。"""
+
+
+class OptionScore(NamedTuple):
+    dx: float
+    dy: float
+    label: str
+    reasoning: str
+
+
+# --- 驗證 ---
+def _require(cond, msg):
+    if not cond:
+        raise QuestionBankError(msg)
+
+
+def _require_number(obj, key, where):
+    value = obj.get(key)
+    _require(isinstance(value, (int, float)) and not isinstance(value, bool),
+             f"{where}: '{key}' 必須是數值")
+
+
+def _validate_options(q, where):
+    options = q.get("options")
+    _require(isinstance(options, list) and options, f"{where}: 缺少 options")
+    seen = set()
+    for opt in options:
+        _require(isinstance(opt.get("id"), str) and opt["id"], f"{where}: 選項缺少 id")
+        _require(opt["id"] not in seen, f"{where}: 選項 id '{opt['id']}' 重複")
+        seen.add(opt["id"])
+        for key in ("text", "label", "reasoning"):
+            _require(isinstance(opt.get(key), str), f"{where}/{opt['id']}: 缺少 '{key}'")
+        _require_number(opt, "dx", f"{where}/{opt['id']}")
+        _require_number(opt, "dy", f"{where}/{opt['id']}")
+
+
+def validate_question_bank(data):
+    _require(isinstance(data, dict), "題庫必須是 JSON 物件")
+    _require(data.get("schema") == SCHEMA_VERSION,
+             f"不支援的題庫 schema：{data.get('schema')!r}（需要 {SCHEMA_VERSION}）")
+    _require(isinstance(data.get("version"), str) and data["version"], "題庫缺少 version")
+    questions = data.get("questions")
+    _require(isinstance(questions, list) and questions, "題庫缺少 questions")
+
+    seen = set()
+    for q in questions:
+        qid = q.get("id")
+        _require(isinstance(qid, str) and qid, "題目缺少 id")
+        _require(qid not in seen, f"題目 id '{qid}' 重複")
+        seen.add(qid)
+        _require(q.get("type") in QUESTION_TYPES, f"{qid}: 未知題型 {q.get('type')!r}")
+
+        if q["type"] == "scale":
+            for key in ("min", "max", "default", "center", "step_dx", "step_dy"):
+                _require_number(q, key, qid)
+            _require(q["min"] < q["max"], f"{qid}: min 必須小於 max")
+            _require(q["min"] <= q["default"] <= q["max"], f"{qid}: default 超出範圍")
+            for key in ("label", "reasoning"):
+                _require(isinstance(q.get(key), str), f"{qid}: 缺少 '{key}'")
+        else:
+            _validate_options(q, qid)
+
+        if q["type"] == "rank":
+            ranks = q.get("ranks")
+            _require(isinstance(ranks, list) and ranks, f"{qid}: 缺少 ranks")
+            _require(len(ranks) <= len(q["options"]), f"{qid}: 排序名次多於選項數")
+            for r in ranks:
+                _require_number(r, "weight", f"{qid}/ranks")
+    return data
+
+
+# --- 編譯 ---
+def compile_scoring_table(data):
+    """將題庫編譯為 {(題號, 選項ID, 名次): OptionScore} 查表。
+
+    一般選擇題與量尺題的名次固定為 0；排序題 (rank) 依名次 1, 2, ...
+    預先乘上該名次的權重。量尺題的選項 ID 為刻度值的字串。
+    """
+    table = {}
+    for q in data["questions"]:
+        qid = q["id"]
+        if q["type"] == "choice":
+            for opt in q["options"]:
+                table[(qid, opt["id"], 0)] = OptionScore(
+                    float(opt["dx"]), float(opt["dy"]), opt["label"], opt["reasoning"])
+        elif q["type"] == "scale":
+            for value in range(int(q["min"]), int(q["max"]) + 1):
+                steps = value - q["center"]
+                table[(qid, str(value), 0)] = OptionScore(
+                    steps * q["step_dx"], steps * q["step_dy"],
+                    q["label"].format(value=value), q["reasoning"].format(value=value))
+        elif q["type"] == "rank":
+            for rank, r in enumerate(q["ranks"], start=1):
+                w = r["weight"]
+                for opt in q["options"]:
+                    table[(qid, opt["id"], rank)] = OptionScore(
+                        opt["dx"] * w, opt["dy"] * w, opt["label"], opt["reasoning"].format(weight=w))
+    return table
+
+
+class QuestionBank:
+    """已驗證、已編譯的題庫。"""
+
+    def __init__(self, data):
+        validate_question_bank(data)
+        self.version = data["version"]
+        self.questions = {q["id"]: q for q in data["questions"]}
+        self._options = {
+            (q["id"], opt["id"]): opt
+            for q in data["questions"] for opt in q.get("options", ())
+        }
+        self._table = compile_scoring_table(data)
+        # 選項代碼：選項在題目中的索引，供計分帳本以小整數儲存
+        self._option_ids = {}
+        for q in data["questions"]:
+            if q["type"] == "scale":
+                self._option_ids[q["id"]] = [str(v) for v in range(int(q["min"]), int(q["max"]) + 1)]
+            else:
+                self._option_ids[q["id"]] = [opt["id"] for opt in q["options"]]
+        self._codes = {
+            (qid, oid): code
+            for qid, ids in self._option_ids.items() for code, oid in enumerate(ids)
+        }
+
+    def question(self, qid):
+        return self.questions[qid]
+
+    def option_ids(self, qid):
+        return list(self._option_ids[qid])
+
+    def option_code(self, qid, option_id):
+        return self._codes[(qid, str(option_id))]
+
+    def option_id(self, qid, code):
+        return self._option_ids[qid][code]
+
+    def option(self, qid, option_id):
+        return self._options[(qid, option_id)]
+
+    def option_text(self, qid, option_id):
+        return self._options[(qid, option_id)]["text"]
+
+    def score(self, qid, option_id, rank=0):
+        try:
+            return self._table[(qid, str(option_id), rank)]
+        except KeyError:
+            raise QuestionBankError(f"{qid}: 無效的選項 {option_id!r} (名次 {rank})") from None
+
+
+def load_question_bank(path=QUESTION_BANK_PATH):
+    with open(path, encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise QuestionBankError(f"無法解析題庫 {path}: {e}") from e
+    return QuestionBank(data)
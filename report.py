@@ -0,0 +1,341 @@
+"""Phase 5 報告的離線繪製 (PNG / PDF) 與全班批次匯出。
+
+報告只取決於作答組合 (ScoreLedger.answer_key) 與題庫版本，因此以兩者的雜湊為鍵快取：
+行程內保留最近繪製的結果，並寫入 CTOS_REPORT_CACHE_DIR (預設 data/reports/)，
+不同行程與批次匯出的工作行程可共用。許多受測者的作答完全相同，批次匯出時
+每種作答組合只繪製一次，再以行程池平行繪製、邊繪製邊寫入同一個 zip。
+
+以 Pillow 繪製 (Streamlit 已依賴)，不需要瀏覽器。中文需要 CJK 字型：
+可以 CTOS_REPORT_FONT 指定字型檔，或放在 assets/fonts/，否則依序嘗試常見的
+Noto / 文泉驛 / 微軟正黑體路徑；都找不到可顯示中文的字型時拋出 ReportFontError，
+不會產生 (並快取) 中文全部變成方框的報告。字型也是快取鍵的一部分。
+"""
+import csv
+import functools
+import hashlib
+import io
+import multiprocessing
+import os
+import time
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+from bootstrap import ledger_region, stability_verdict
+from ledger import QUADRANT_LABELS, parse_answer_key, rebuild_ledger
+from question_bank import load_question_bank
+
+DEFAULT_CACHE_DIR = Path(__file__).with_name("data") / "reports"
+FONT_DIR = Path(__file__).with_name("assets") / "fonts"
+FORMATS = ("png", "pdf")
+# 報告內容或版面改變時遞增，磁碟快取中的舊報告不再沿用
+LAYOUT_VERSION = 2
+FONT_CANDIDATES = (
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "C:/Windows/Fonts/msjh.ttc",
+)
+
+WIDTH = 1240
+MARGIN = 60
+MAP_SIZE = 640
+DOMAIN = 20.0
+COLORS = {"text": "#2c3e50", "muted": "#7f8c8d", "axis": "#95a5a6", "point": "#e74c3c",
+          "ok": "#27ae60", "info": "#2980b9", "error": "#c0392b", "bar": "#3498db"}
+
+
+class ReportFontError(RuntimeError):
+    """找不到可顯示中文的字型。"""
+
+
+def report_key(bank_version, answer_key, fmt, font=""):
+    raw = f"{LAYOUT_VERSION}\n{bank_version}\n{answer_key}\n{fmt}\n{font}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+# --- 字型 ---
+def _has_cjk(path):
+    # 缺字時繪出的是 .notdef 方框，與字型中不存在的字元相同
+    try:
+        font = ImageFont.truetype(str(path), 32)
+    except OSError:
+        return False
+    glyphs = []
+    for text in ("報告", "\U0010fffd\U0010fffd"):
+        image = Image.new("L", (96, 48))
+        ImageDraw.Draw(image).text((0, 0), text, font=font, fill=255)
+        glyphs.append(image.tobytes())
+    return glyphs[0] != glyphs[1]
+
+
+@functools.lru_cache(maxsize=None)
+def font_path():
+    """第一個可顯示中文的字型檔；找不到時拋出 ReportFontError。"""
+    env = os.environ.get("CTOS_REPORT_FONT")
+    bundled = sorted(p for p in FONT_DIR.glob("*") if p.suffix.lower() in (".ttf", ".ttc", ".otf"))
+    candidates = ([Path(env)] if env else []) + bundled + [Path(c) for c in FONT_CANDIDATES]
+    for candidate in candidates:
+        if candidate.exists() and _has_cjk(candidate):
+            return candidate
+    raise ReportFontError("找不到可顯示中文的字型：請安裝 Noto Sans CJK 等字型、放到 assets/fonts/，"
+                          "或以 CTOS_REPORT_FONT 指定字型檔")
+
+
+def font_identity():
+    """快取鍵中的字型識別 (檔名、大小與修改時間)，更換字型後不會沿用舊報告。"""
+    path = font_path()
+    stat = path.stat()
+    return f"{path.name}:{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def fonts_available():
+    try:
+        font_path()
+    except ReportFontError:
+        return False
+    return True
+
+
+# --- 繪製 ---
+@functools.lru_cache(maxsize=None)
+def _font(size):
+    return ImageFont.truetype(str(font_path()), size)
+
+
+def _wrap(draw, text, font, width):
+    """依實際字寬換行 (中文沒有空白可斷行，逐字累加)。"""
+    lines = []
+    for paragraph in str(text).splitlines() or [""]:
+        if draw.textlength(paragraph, font=font) <= width:
+            lines.append(paragraph)
+            continue
+        line = ""
+        for ch in paragraph:
+            if draw.textlength(line + ch, font=font) > width and line:
+                lines.append(line)
+                line = ch
+            else:
+                line += ch
+        lines.append(line)
+    return lines
+
+
+class _Canvas:
+    """由上而下排版的畫布；高度不足時自動加長。"""
+
+    def __init__(self, height=1754):
+        self.image = Image.new("RGB", (WIDTH, height), "white")
+        self.draw = ImageDraw.Draw(self.image)
+        self.y = MARGIN
+
+    def ensure(self, height):
+        if self.y + height + MARGIN > self.image.height:
+            grown = Image.new("RGB", (WIDTH, self.y + height + MARGIN + 400), "white")
+            grown.paste(self.image, (0, 0))
+            self.image = grown
+            self.draw = ImageDraw.Draw(self.image)
+
+    def text(self, text, size=22, color="text", indent=0, gap=8):
+        font = _font(size)
+        for line in _wrap(self.draw, text, font, WIDTH - 2 * MARGIN - indent):
+            self.ensure(size + gap)
+            self.draw.text((MARGIN + indent, self.y), line, font=font, fill=COLORS[color])
+            self.y += size + gap
+
+    def space(self, height):
+        self.y += height
+
+    def finish(self):
+        return self.image.crop((0, 0, WIDTH, self.y + MARGIN))
+
+
+def _draw_map(canvas, x, y, ellipse):
+    canvas.ensure(MAP_SIZE + 40)
+    left = (WIDTH - MAP_SIZE) // 2
+    top = canvas.y
+    # 繪圖區另開一張圖，超出座標範圍的橢圓會被裁切而不會畫到外框之外
+    plot = Image.new("RGB", (MAP_SIZE, MAP_SIZE), "white")
+    draw = ImageDraw.Draw(plot)
+    to_px = lambda vx, vy: ((vx + DOMAIN) / (2 * DOMAIN) * MAP_SIZE, (DOMAIN - vy) / (2 * DOMAIN) * MAP_SIZE)
+    cx, cy = to_px(0, 0)
+    for i in range(0, MAP_SIZE, 16):
+        draw.line([i, cy, i + 8, cy], fill=COLORS["axis"], width=1)
+        draw.line([cx, i, cx, i + 8], fill=COLORS["axis"], width=1)
+    font = _font(18)
+    for quadrant, (qx, qy) in {1: (8, 8), 2: (-8, 8), 3: (-8, -8), 4: (8, -8)}.items():
+        draw.text(to_px(qx, qy), QUADRANT_LABELS[quadrant], font=font, fill=COLORS["axis"], anchor="mm")
+    if ellipse:
+        draw.line([to_px(p["X"], p["Y"]) for p in ellipse], fill=COLORS["point"], width=2)
+    px, py = to_px(max(-DOMAIN, min(DOMAIN, x)), max(-DOMAIN, min(DOMAIN, y)))
+    draw.ellipse([px - 12, py - 12, px + 12, py + 12], fill=COLORS["point"])
+    canvas.image.paste(plot, (left, top))
+
+    draw = canvas.draw
+    draw.rectangle([left, top, left + MAP_SIZE, top + MAP_SIZE], outline=COLORS["axis"], width=2)
+    small = _font(16)
+    draw.text((left, top + MAP_SIZE + 8), "主觀建構", font=small, fill=COLORS["muted"])
+    draw.text((left + MAP_SIZE, top + MAP_SIZE + 8), "客觀實證", font=small, fill=COLORS["muted"], anchor="ra")
+    draw.text((left - 8, top), "理性分析", font=small, fill=COLORS["muted"], anchor="ra")
+    draw.text((left - 8, top + MAP_SIZE), "情感體驗", font=small, fill=COLORS["muted"], anchor="rd")
+    canvas.y = top + MAP_SIZE + 40
+
+
+def _draw_bars(canvas, quadrant_prob):
+    font = _font(18)
+    bar_left = MARGIN + 320
+    bar_width = WIDTH - MARGIN - bar_left - 80
+    for quadrant, label in QUADRANT_LABELS.items():
+        canvas.ensure(32)
+        prob = quadrant_prob[quadrant]
+        canvas.draw.text((MARGIN, canvas.y), label, font=font, fill=COLORS["text"])
+        canvas.draw.rectangle([bar_left, canvas.y + 4, bar_left + max(prob * bar_width, 1), canvas.y + 22],
+                              fill=COLORS["bar"])
+        canvas.draw.text((bar_left + bar_width + 10, canvas.y), f"{prob:.0%}", font=font, fill=COLORS["text"])
+        canvas.y += 32
+
+
+def render_report(bank, answer_key, fmt="png"):
+    """繪製一份報告並回傳檔案內容 (bytes)；沒有中文字型時拋出 ReportFontError。"""
+    if fmt not in FORMATS:
+        raise ValueError(f"不支援的格式：{fmt}")
+    ledger = rebuild_ledger(bank, parse_answer_key(answer_key))
+    canvas = _Canvas()
+    canvas.text("諮商專業取向分析報告", size=40)
+    canvas.text(f"題庫版本 {bank.version}　座標 X = {ledger.x:.2f}，Y = {ledger.y:.2f}　作答 {len(ledger)} 題",
+                size=18, color="muted")
+    canvas.space(20)
+
+    canvas.text("1. 亂答檢測與定位穩定度", size=28)
+    if len(ledger) == 0:
+        canvas.text("尚未偵測到作答數據。", color="error")
+        region = None
+    else:
+        region = ledger_region(ledger)
+        _, is_random = ledger.flags()
+        if is_random:
+            canvas.text("作答有效性警示：系統偵測到您的作答模式存在高度隨機性。建議您重新靜心施測。", color="error")
+        else:
+            stable, title, detail = stability_verdict(region["quadrant_prob"], len(ledger))
+            canvas.text(f"{title}：{detail}", color="ok" if stable else "info")
+        canvas.space(10)
+        _draw_bars(canvas, region["quadrant_prob"])
+    canvas.space(20)
+
+    canvas.text("2. 理論地圖定位", size=28)
+    canvas.space(10)
+    _draw_map(canvas, ledger.x, ledger.y, region["ellipse"] if region else None)
+
+    canvas.text("3. 個人化脈絡分析", size=28)
+    for qid, rank, code, _, _ in ledger.entries():
+        item = bank.score(qid, bank.option_id(qid, code), rank)
+        canvas.text(f"【{qid}】{item.label}", size=20)
+        canvas.text(f"分析：{item.reasoning}", size=18, color="muted", indent=24)
+
+    image = canvas.finish()
+    buf = io.BytesIO()
+    if fmt == "pdf":
+        image.save(buf, "PDF", resolution=150)
+    else:
+        image.save(buf, "PNG")
+    return buf.getvalue()
+
+
+# --- 快取 ---
+def _cache_dir():
+    return Path(os.environ.get("CTOS_REPORT_CACHE_DIR") or DEFAULT_CACHE_DIR)
+
+
+@functools.lru_cache(maxsize=64)
+def _get_report(bank, answer_key, fmt, font):
+    path = _cache_dir() / f"{report_key(bank.version, answer_key, fmt, font)}.{fmt}"
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+    data = render_report(bank, answer_key, fmt)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # 快取目錄不可寫時仍回傳結果
+    return data
+
+
+def get_report(bank, answer_key, fmt="png"):
+    """取得報告 (先查行程內快取，再查磁碟快取，都沒有才繪製)。"""
+    return _get_report(bank, answer_key, fmt, font_identity())
+
+
+# --- 批次匯出 ---
+_BANK = None
+
+
+def _init_worker():
+    global _BANK
+    _BANK = load_question_bank()
+
+
+def _render_worker(task):
+    answer_key, fmt = task
+    return get_report(_BANK, answer_key, fmt)
+
+
+def latest_results(response_store, bank_version, since_id=0):
+    """每位受測者在指定題庫版本下最新一筆結果的 (result_id, answer_key, created_at)，可限定 results.id 起點。
+
+    answer_key 以選項代碼記錄，只能以同一版題庫重建，因此不提供跨版本查詢。
+    不回傳 session_id：它同時是可還原、修改作答的 resume token。
+    """
+    sql = ("SELECT id, answer_key, created_at FROM results WHERE id IN"
+           " (SELECT MAX(id) FROM results WHERE id > ? AND bank_version = ? GROUP BY session_id) ORDER BY id")
+    return [tuple(row) for row in response_store.reader().execute(sql, (since_id, bank_version)).fetchall()]
+
+
+def export_zip(bank, results, out, fmt="png", workers=None):
+    """將 latest_results 的每筆結果寫成 zip 中的一份報告 (out 為路徑或檔案物件)，回傳報告數。
+
+    相同的作答組合只繪製一次；workers > 1 時以行程池平行繪製，邊繪製邊寫入。
+    檔名為 report-<result_id>，另附 manifest.csv 列出每個檔案的結果編號與完成時間。
+    """
+    font_path()  # 沒有中文字型時在啟動行程池之前就失敗
+    copies = defaultdict(list)
+    for result_id, answer_key, created_at in results:
+        copies[answer_key].append((result_id, created_at))
+    keys = list(copies)
+    workers = workers or os.cpu_count() or 1
+
+    pool = None
+    if workers == 1 or len(keys) <= 1:
+        rendered = (get_report(bank, key, fmt) for key in keys)
+    else:
+        # spawn：在多執行緒的伺服器行程中 fork 並不安全
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(keys)), initializer=_init_worker,
+                                   mp_context=multiprocessing.get_context("spawn"))
+        rendered = pool.map(_render_worker, [(key, fmt) for key in keys], chunksize=max(1, len(keys) // (workers * 4)))
+    manifest = []
+    try:
+        # PNG / PDF 本身已壓縮，zip 只儲存不再壓縮
+        with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as zf:
+            for key, data in zip(keys, rendered):
+                for result_id, created_at in copies[key]:
+                    entry = f"report-{result_id}.{fmt}"
+                    zf.writestr(entry, data)
+                    manifest.append((result_id, entry, created_at))
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(["entry", "result_id", "completed_at"])
+            for result_id, entry, created_at in sorted(manifest):
+                writer.writerow([entry, result_id, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created_at))])
+            # BOM 讓 Excel 以 UTF-8 開啟
+            zf.writestr("manifest.csv", buf.getvalue().encode("utf-8-sig"))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return len(manifest)
@@ -0,0 +1,127 @@
+"""不依賴 Streamlit 的批次計分引擎。
+
+每位受測者表示為 one-hot 作答向量 (每個作答位置的每個選項一維)，
+題庫編譯為「選項 × (dx, dy)」權重矩陣，所有人的座標一次矩陣乘法算出。
+排序題 (Phase 3 陰影) 的名次權重與量尺題 (Phase 1 校準) 的刻度分數
+都已預先編入權重矩陣，結果與網頁版 ScoreLedger 一致。
+"""
+import numpy as np
+
+from ledger import INCONSISTENT_VARIANCE, RANDOM_RADIUS, RANDOM_VARIANCE, VARIANCE_DECIMALS
+
+MISSING = -1
+
+
+class ScoringMatrix:
+    """由題庫編譯的權重矩陣。
+
+    slots 為作答位置 (題號, 名次) 的順序，columns 為對應的表格欄名：
+    一般題為題號，排序題為「題號_名次」(例如 P3-Q1_1)。
+    """
+
+    def __init__(self, bank):
+        self.bank = bank
+        self.slots = []
+        self.columns = []
+        self.offsets = []
+        self.sizes = []
+        rows = []
+        for qid, q in bank.questions.items():
+            ranks = range(1, len(q["ranks"]) + 1) if q["type"] == "rank" else (0,)
+            option_ids = bank.option_ids(qid)
+            for rank in ranks:
+                self.slots.append((qid, rank))
+                self.columns.append(f"{qid}_{rank}" if rank else qid)
+                self.offsets.append(len(rows))
+                self.sizes.append(len(option_ids))
+                for oid in option_ids:
+                    s = bank.score(qid, oid, rank)
+                    rows.append((s.dx, s.dy))
+        self.weights = np.asarray(rows, dtype=np.float64)
+        self.weights_sq = self.weights ** 2
+        self.offsets = np.asarray(self.offsets, dtype=np.intp)
+        self.sizes = np.asarray(self.sizes, dtype=np.intp)
+        # 排序題的作答位置：名次重複或缺答時，網頁版整題不計分
+        self.rank_groups = [
+            [i for i, (qid, rank) in enumerate(self.slots) if qid == gid and rank]
+            for gid, q in bank.questions.items() if q["type"] == "rank"
+        ]
+
+    @property
+    def n_features(self):
+        return len(self.weights)
+
+    def codes_from_ids(self, table):
+        """將 {欄名: 選項ID 序列} 轉為 (人數, 作答位置數) 的代碼矩陣，缺答為 MISSING。"""
+        n = len(next(iter(table.values()))) if table else 0
+        codes = np.full((n, len(self.slots)), MISSING, dtype=np.int16)
+        for j, ((qid, _), column) in enumerate(zip(self.slots, self.columns)):
+            if column not in table:
+                continue
+            lookup = {oid: code for code, oid in enumerate(self.bank.option_ids(qid))}
+            codes[:, j] = [lookup.get(_normalize(v), MISSING) for v in table[column]]
+        return codes
+
+    def validate_ranks(self, codes):
+        codes = codes.copy()
+        for group in self.rank_groups:
+            sub = codes[:, group]
+            invalid = (sub == MISSING).any(axis=1)
+            srt = np.sort(sub, axis=1)
+            invalid |= (srt[:, 1:] == srt[:, :-1]).any(axis=1)
+            sub[invalid] = MISSING
+            codes[:, group] = sub
+        return codes
+
+    def one_hot(self, codes):
+        n = len(codes)
+        onehot = np.zeros((n, self.n_features), dtype=np.float64)
+        rows, cols = np.nonzero(codes != MISSING)
+        onehot[rows, self.offsets[cols] + codes[rows, cols]] = 1.0
+        return onehot
+
+    def score(self, codes):
+        """對代碼矩陣計分，回傳各欄為 numpy 陣列的 dict。"""
+        codes = self.validate_ranks(np.asarray(codes, dtype=np.int16))
+        onehot = self.one_hot(codes)
+        sums = onehot @ self.weights
+        sums_sq = onehot @ self.weights_sq
+        n = onehot.sum(axis=1)
+
+        safe_n = np.maximum(n, 1)[:, None]
+        mean = sums / safe_n
+        var = np.where((n >= 2)[:, None], np.maximum(sums_sq / safe_n - mean ** 2, 0.0), 0.0)
+
+        x, y = sums[:, 0], sums[:, 1]
+        total_variance = var[:, 0] + var[:, 1]
+        # 與 ledger.consistency_flags 相同：四捨五入後再比較門檻
+        rounded = np.round(total_variance, VARIANCE_DECIMALS)
+        return {
+            "X": x,
+            "Y": y,
+            "n_answers": n.astype(np.int16),
+            "var_x": var[:, 0],
+            "var_y": var[:, 1],
+            "total_variance": total_variance,
+            "is_inconsistent": rounded > INCONSISTENT_VARIANCE,
+            "is_random": (np.abs(x) < RANDOM_RADIUS) & (np.abs(y) < RANDOM_RADIUS) & (rounded > RANDOM_VARIANCE),
+            "quadrant": quadrants(x, y),
+        }
+
+
+def quadrants(x, y):
+    """quadrant_of 的向量化版本：1-4 為象限，落在軸上為 0。"""
+    q = np.where(y > 0, np.where(x > 0, 1, 2), np.where(x > 0, 4, 3))
+    return np.where((x == 0) | (y == 0), 0, q).astype(np.int8)
+
+
+def _normalize(value):
+    # 試算表常把 1 讀成 1.0
+    if value is None or value != value:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+    if text.endswith(".0") and text[:-2].isdigit():
+        text = text[:-2]
+    return text
@@ -0,0 +1,68 @@
+"""先暖機再啟動 Streamlit 伺服器 (供自動擴充的容器使用)。
+
+`streamlit run app.py` 在第一位受測者連線時才載入題庫、資料庫與各種資源，
+第一次開啟 Phase 5 時才匯入 pandas / altair 並建立理論地圖的圖層。
+本腳本在同一個行程內先完成這些工作，再啟動伺服器；
+因為暖機在伺服器啟動前進行，健康檢查 (/_stcore/health) 回應正常時快取都已就緒。
+
+用法：python serve.py [--no-warmup] [streamlit run 的其他參數，例如 --server.port 8501]
+"""
+import importlib
+import sys
+import time
+from pathlib import Path
+
+APP = Path(__file__).with_name("app.py")
+
+# 只有 Phase 5 (與教師頁) 用到的重量級套件；app.py 與前幾個階段不會匯入
+WARM_MODULES = ("numpy", "pandas", "altair", "PIL.Image")
+
+
+def warm_up(log=None):
+    """匯入重量級套件並建立每個行程共用的快取，回傳 {步驟: 秒數}。"""
+    timings = {}
+
+    def step(name, fn):
+        t0 = time.perf_counter()
+        fn()
+        timings[name] = time.perf_counter() - t0
+        if log:
+            log(f"[warm-up] {name}: {timings[name] * 1000:.0f} ms")
+
+    def phase5_caches():
+        import bootstrap
+        import theory_map
+        from outcome_table import OutcomeTable, OutcomeTableError
+
+        theory_map.base_spec()
+        bootstrap.bootstrap_position([0.0, 1.0], [0.0, 1.0], n_boot=16)
+        try:
+            OutcomeTable()  # 讓結果表的檔案頁面進入作業系統快取
+        except OutcomeTableError:
+            pass
+
+    step("imports", lambda: [importlib.import_module(name) for name in WARM_MODULES])
+    # common 在匯入時建立題庫、資料庫、session store 與靜態資源 (st.cache_resource)，
+    # 之後 app.py 在同一行程內匯入時直接沿用
+    step("common", lambda: importlib.import_module("common"))
+    step("phase5", phase5_caches)
+    return timings
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if "--no-warmup" in argv:
+        argv.remove("--no-warmup")
+    else:
+        t0 = time.perf_counter()
+        warm_up(log=lambda msg: print(msg, file=sys.stderr))
+        print(f"[warm-up] done in {time.perf_counter() - t0:.2f} s", file=sys.stderr)
+
+    from streamlit.web import cli
+
+    # 不論從哪個目錄啟動都提供 static/ (樣式表以 <link> 引用，見 assets.py)
+    return cli.main(["run", str(APP), "--server.enableStaticServing", "true", *argv], prog_name="streamlit")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""作答進度的外部檢查點 (checkpoint)。
+
+session 狀態不再只存在單一 Streamlit 行程的記憶體中：每次作答後寫入
+可替換的 SessionStore，斷線或連到另一個副本時以網址上的 resume token 還原。
+
+可用環境變數 CTOS_SESSION_STORE 選擇實作：
+    sqlite (預設)  與作答資料庫共用同一個 SQLite 檔 (見 store.py)
+    file          每個 token 一個 JSON 檔，目錄由 CTOS_SESSION_DIR 指定
+    none          停用檢查點
+"""
+import abc
+import atexit
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+
+DEFAULT_SESSION_DIR = Path(__file__).with_name("data") / "sessions"
+_TOKEN_RE = re.compile(r"[0-9a-f]{32}")
+
+log = logging.getLogger(__name__)
+
+
+def is_valid_token(token):
+    return isinstance(token, str) and _TOKEN_RE.fullmatch(token) is not None
+
+
+class SessionStore(abc.ABC):
+    """檢查點儲存介面；state 為可 JSON 序列化的 dict。"""
+
+    @abc.abstractmethod
+    def save(self, token, state):
+        ...
+
+    @abc.abstractmethod
+    def load(self, token):
+        ...
+
+
+class NullSessionStore(SessionStore):
+    def save(self, token, state):
+        pass
+
+    def load(self, token):
+        return None
+
+
+class FileSessionStore(SessionStore):
+    """每個 token 一個 JSON 檔。
+
+    與 ResponseStore 相同採 write-behind：save() 只把狀態交給背景執行緒，
+    按鈕回呼不等待檔案 I/O；同一 token 尚未寫出的狀態只保留最新一份，
+    load() 會先查看尚未寫出的狀態。
+    """
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or os.environ.get("CTOS_SESSION_DIR") or DEFAULT_SESSION_DIR)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._pending = {}
+        self._writing = {}
+        self._cond = threading.Condition()
+        self._writer = threading.Thread(target=self._write_loop, name="ctos-session-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    def _path(self, token):
+        if not is_valid_token(token):
+            raise ValueError(f"無效的 resume token：{token!r}")
+        return self.directory / f"{token}.json"
+
+    def save(self, token, state):
+        self._path(token)  # 無效的 token 在呼叫端就拋出錯誤
+        with self._cond:
+            self._pending[token] = state
+            self._cond.notify()
+
+    def flush(self, timeout=30.0):
+        """等待尚未寫出的狀態全部寫入檔案；逾時回傳 False。"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def _write(self, token, state):
+        # 先寫入暫存檔再 rename，避免其他副本讀到寫了一半的檔案
+        path = self._path(token)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                self._writing, self._pending = self._pending, {}
+            for token, state in self._writing.items():
+                try:
+                    self._write(token, state)
+                except (OSError, TypeError, ValueError) as exc:
+                    log.error("無法寫入檢查點 %s：%s", token, exc)
+            with self._cond:
+                self._writing = {}
+                self._cond.notify_all()
+
+    def load(self, token):
+        if not is_valid_token(token):
+            return None
+        with self._cond:
+            state = self._pending.get(token, self._writing.get(token))
+        if state is not None:
+            return state
+        try:
+            return json.loads(self._path(token).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+
+class SQLiteSessionStore(SessionStore):
+    """寫入經由 ResponseStore 的背景佇列，不阻塞按鈕回呼。"""
+
+    def __init__(self, response_store):
+        self.response_store = response_store
+
+    def save(self, token, state):
+        self.response_store.save_session(token, json.dumps(state, ensure_ascii=False))
+
+    def load(self, token):
+        if not is_valid_token(token):
+            return None
+        raw = self.response_store.load_session(token)
+        return None if raw is None else json.loads(raw)
+
+
+def create_session_store(response_store, kind=None):
+    kind = kind or os.environ.get("CTOS_SESSION_STORE", "sqlite")
+    if kind == "sqlite":
+        return SQLiteSessionStore(response_store)
+    if kind == "file":
+        return FileSessionStore()
+    if kind == "none":
+        return NullSessionStore()
+    raise ValueError(f"未知的 CTOS_SESSION_STORE：{kind!r}")
@@ -0,0 +1,246 @@
+"""作答資料的 SQLite 永久儲存。
+
+每個行程共用一個 ResponseStore (app 端透過 st.cache_resource 建立)：
+寫入以背景執行緒批次處理 (write-behind)，按鈕回呼只把資料放進佇列，
+不需等待磁碟 I/O；讀取則使用每個執行緒各自的唯讀連線。
+資料庫採 WAL 模式，並以 PRAGMA user_version 管理 schema 遷移。
+"""
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_DB_PATH = Path(__file__).with_name("data") / "ctos.sqlite3"
+WRITE_RETRIES = 5
+RETRY_DELAY = 0.1
+
+log = logging.getLogger(__name__)
+
+# --- Schema 遷移 (索引 + 1 即為套用後的 user_version) ---
+MIGRATIONS = [
+    """
+    CREATE TABLE answers (
+        id INTEGER PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        question_id TEXT NOT NULL,
+        rank INTEGER NOT NULL,
+        option_code INTEGER NOT NULL,
+        dx REAL NOT NULL,
+        dy REAL NOT NULL,
+        bank_version TEXT NOT NULL,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX answers_session ON answers (session_id);
+
+    CREATE TABLE results (
+        id INTEGER PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        x REAL NOT NULL,
+        y REAL NOT NULL,
+        var_x REAL NOT NULL,
+        var_y REAL NOT NULL,
+        is_inconsistent INTEGER NOT NULL,
+        is_random INTEGER NOT NULL,
+        answer_key TEXT NOT NULL,
+        bank_version TEXT NOT NULL,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX results_session ON results (session_id);
+    """,
+    """
+    CREATE TABLE sessions (
+        token TEXT PRIMARY KEY,
+        state TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE reference_profiles (
+        id INTEGER PRIMARY KEY,
+        x REAL NOT NULL,
+        y REAL NOT NULL,
+        orientation TEXT NOT NULL,
+        source TEXT NOT NULL,
+        created_at REAL NOT NULL
+    );
+    """,
+]
+
+_INSERT_SQL = {
+    "answer": "INSERT INTO answers (session_id, question_id, rank, option_code, dx, dy, bank_version, created_at)"
+              " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    "result": "INSERT INTO results (session_id, x, y, var_x, var_y, is_inconsistent, is_random, answer_key,"
+              " bank_version, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "session": "INSERT INTO sessions (token, state, updated_at) VALUES (?, ?, ?)"
+               " ON CONFLICT (token) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+    "reference": "INSERT INTO reference_profiles (x, y, orientation, source, created_at) VALUES (?, ?, ?, ?, ?)",
+}
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _statements(script):
+    """把遷移腳本拆成單一敘述 (executescript 會先提交目前的交易，不能在寫入鎖內使用)。"""
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            yield statement.strip()
+            statement = ""
+
+
+def migrate(conn):
+    """套用尚未執行的遷移，回傳目前的 schema 版本。
+
+    先以 BEGIN IMMEDIATE 取得寫入鎖再讀 user_version：多個行程同時開啟新資料庫時，
+    只有第一個會執行遷移，其餘等鎖釋放後讀到已更新的版本。
+    """
+    isolation_level, conn.isolation_level = conn.isolation_level, None
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for target, script in enumerate(MIGRATIONS[version:], start=version + 1):
+                for statement in _statements(script):
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {target}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.isolation_level = isolation_level
+    return max(version, len(MIGRATIONS))
+
+
+class ResponseStore:
+    """批次寫入的作答資料庫。"""
+
+    def __init__(self, path=None, batch_size=256, flush_interval=0.2):
+        self.path = str(path or os.environ.get("CTOS_DB_PATH") or DEFAULT_DB_PATH)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        conn = _connect(self.path)
+        try:
+            self.schema_version = migrate(conn)
+        finally:
+            conn.close()
+
+        self._queue = queue.SimpleQueue()
+        self._local = threading.local()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="ctos-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # --- 寫入 (非阻塞) ---
+    def record_answer(self, session_id, question_id, rank, option_code, dx, dy, bank_version):
+        self._queue.put(("answer", (session_id, question_id, rank, option_code, dx, dy, bank_version, time.time())))
+
+    def record_result(self, session_id, x, y, var_x, var_y, is_inconsistent, is_random, answer_key, bank_version):
+        self._queue.put(("result", (session_id, x, y, var_x, var_y, int(is_inconsistent), int(is_random),
+                                    answer_key, bank_version, time.time())))
+
+    def save_session(self, token, state):
+        self._queue.put(("session", (token, state, time.time())))
+
+    def record_reference(self, x, y, orientation, source):
+        self._queue.put(("reference", (x, y, orientation, source, time.time())))
+
+    def flush(self, timeout=30.0):
+        """等待目前佇列中的資料全部寫入；逾時或寫入執行緒已停止時回傳 False。"""
+        if not self._writer.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(("stop", None))
+        self._writer.join(timeout=10)
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        stop = False
+        while not stop:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = {kind: [] for kind in _INSERT_SQL}
+            waiters = []
+            while True:
+                kind, payload = item
+                if kind == "stop":
+                    stop = True
+                elif kind == "flush":
+                    waiters.append(payload)
+                else:
+                    batch[kind].append(payload)
+                if stop or sum(map(len, batch.values())) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(conn, batch)
+            except Exception:  # noqa: BLE001 - 寫入執行緒不可中止，否則之後的資料都會遺失
+                log.exception("寫入批次時發生未預期的錯誤，捨棄 %d 筆", sum(map(len, batch.values())))
+            finally:
+                for done in waiters:
+                    done.set()
+        conn.close()
+
+    def _write_batch(self, conn, batch):
+        """整批在一個交易內寫入；資料庫忙碌時重試，個別資料列有誤時改為逐筆寫入並只捨棄錯誤的列。"""
+        for attempt in range(WRITE_RETRIES):
+            try:
+                with conn:
+                    for kind, rows in batch.items():
+                        if rows:
+                            conn.executemany(_INSERT_SQL[kind], rows)
+                return
+            except sqlite3.OperationalError as exc:
+                # database is locked / disk I/O error 等暫時性錯誤
+                if attempt + 1 == WRITE_RETRIES:
+                    log.error("寫入失敗 (已重試 %d 次)，捨棄 %d 筆：%s", WRITE_RETRIES,
+                              sum(map(len, batch.values())), exc)
+                    return
+                time.sleep(RETRY_DELAY * 2 ** attempt)
+            except sqlite3.Error:
+                break
+        for kind, rows in batch.items():
+            for row in rows:
+                try:
+                    with conn:
+                        conn.execute(_INSERT_SQL[kind], row)
+                except sqlite3.Error as exc:
+                    log.error("捨棄無法寫入的 %s 資料列 %r：%s", kind, row, exc)
+
+    # --- 讀取 (每個執行緒一條連線) ---
+    def reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.path)
+            conn.row_factory = sqlite3.Row
+        return conn
+
+    def load_session(self, token):
+        row = self.reader().execute("SELECT state FROM sessions WHERE token = ?", (token,)).fetchone()
+        return None if row is None else row["state"]
@@ -0,0 +1,54 @@
+"""Phase 5 理論地圖的 Vega-Lite 規格。
+
+象限文字、十字虛線、座標軸與各圖層的編碼每個行程只建立並序列化一次；
+使用者的點、信賴橢圓與同儕密度方格以具名資料集 (named dataset) 表示，
+每次繪圖只替換資料集內容，不必重建整份分層規格。
+"""
+import functools
+
+import altair as alt
+import pandas as pd
+
+USER_DATASET = "user_point"
+COHORT_DATASET = "cohort_cells"
+REGION_DATASET = "confidence_region"
+DOMAIN = [-20, 20]
+
+
+@functools.lru_cache(maxsize=None)
+def base_spec():
+    quadrants = pd.DataFrame({
+        'x': [8, -8, -8, 8],
+        'y': [8, 8, -8, -8],
+        'text': ['I. 認知行為\n(客觀/理性)', 'II. 心理動力\n(主觀/理性)', 'III. 人本體驗\n(主觀/感性)', 'IV. 系統策略\n(客觀/行動)']
+    })
+    x_axis = alt.X('X:Q', scale=alt.Scale(domain=DOMAIN), title='主觀建構 <---> 客觀實證')
+    y_axis = alt.Y('Y:Q', scale=alt.Scale(domain=DOMAIN), title='情感體驗 <---> 理性分析')
+
+    cohort = alt.Chart(alt.NamedData(COHORT_DATASET)).mark_rect(opacity=0.6).encode(
+        x='x:Q', x2='x2:Q', y='y:Q', y2='y2:Q',
+        color=alt.Color('count:Q', scale=alt.Scale(scheme='blues'), title='人數'),
+        tooltip=[alt.Tooltip('count:Q', title='人數')]
+    )
+    rules = alt.Chart(pd.DataFrame({'x': [0], 'y': [0]})).mark_rule(color='gray', strokeDash=[4,4]).encode(x='x', y='y')
+    text = alt.Chart(quadrants).mark_text(fontSize=16, color='#95a5a6').encode(x='x', y='y', text='text')
+    region = alt.Chart(alt.NamedData(REGION_DATASET)).mark_line(color='#e74c3c', strokeDash=[6, 3], opacity=0.7).encode(
+        x='X:Q', y='Y:Q', order='order:Q'
+    )
+    points = alt.Chart(alt.NamedData(USER_DATASET)).mark_circle(size=500, color='#e74c3c').encode(
+        x=x_axis, y=y_axis, tooltip=['Label:N', 'X:Q', 'Y:Q']
+    )
+    return alt.layer(cohort, text, rules, region, points).properties(width=700, height=600).interactive().to_dict()
+
+
+def render_spec(x, y, cohort_cells=None, region=None):
+    """回傳可直接交給 st.vega_lite_chart 的規格；只有具名資料集隨使用者改變。"""
+    base = base_spec()
+    spec = dict(base)
+    spec["datasets"] = {
+        **base.get("datasets", {}),
+        USER_DATASET: [{"X": x, "Y": y, "Label": "您的位置"}],
+        COHORT_DATASET: cohort_cells if cohort_cells is not None else [],
+        REGION_DATASET: region if region is not None else [],
+    }
+    return spec